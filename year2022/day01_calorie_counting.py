@@ -3,53 +3,138 @@
 
 Usage example:
     Advent_Of_Code/year2022 $ python day01.py day01_test.txt day01_input.txt
+
+top_elves() answers both parts in one pass over the file without reading it into memory:
+the file is memory-mapped and cut into chunks that end on blank lines, each chunk is split into elves
+and the calories are parsed straight from bytes, and only the K largest totals are kept in a min-heap.
+With workers > 1, a file of at least PARALLEL_MIN_SIZE bytes is cut at blank lines into one range per worker process
+and their heaps are merged. Blank lines are found with either LF or CRLF line endings.
 """
 import sys
+import os
+import re
+import tempfile
 import pathlib
 import itertools
+import heapq
+import mmap
+import concurrent.futures
+from typing import *
+
+BLANK_LINE = b'\n\n'
+BLANK_LINE_PATTERN = re.compile(rb'\n\r?\n')     # also matches the blank lines of files with CRLF line endings
+CHUNK_SIZE = 1 << 24
+PARALLEL_MIN_SIZE = 1 << 26     # smaller files are read by a single process
 
 
 def parse(txt_filename: str) -> list[str]:
     return pathlib.Path(txt_filename).read_text().splitlines()
 
 
+def _push(heap: list[int], total: int, k: int) -> None:
+    """Keep the k largest totals seen so far in the min-heap."""
+    if len(heap) < k:
+        heapq.heappush(heap, total)
+    elif total > heap[0]:
+        heapq.heapreplace(heap, total)
+
+
+def top_k(totals: Iterable[int], k: int) -> list[int]:
+    """Return the k largest totals in descending order."""
+    heap: list[int] = []
+    for total in totals:
+        _push(heap, total, k)
+    return sorted(heap, reverse=True)
+
+
+def elf_totals(lines: Iterable[str]) -> Iterator[int]:
+    """Yield the total calories carried by each elf."""
+    for is_elf, sack in itertools.groupby(lines, key=lambda l: l != ''):
+        if is_elf:
+            yield sum(int(calories) for calories in sack)
+
+
+def _next_boundary(buffer: mmap.mmap, position: int, end: int) -> int:
+    """Return the position right after the first blank line at or after `position`, or `end` if there is none."""
+    found = BLANK_LINE_PATTERN.search(buffer, position, end)
+    return end if found is None else found.end()
+
+
+def _top_k_in_range(txt_filename: str, start: int, end: int, k: int, chunk_size: int = CHUNK_SIZE) -> list[int]:
+    """
+    Return the min-heap of the k largest totals of the elves in the bytes [start, end) of the file,
+    which must begin and end on elf boundaries.
+    """
+    heap: list[int] = []
+    with open(txt_filename, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        while start < end:
+            stop = _next_boundary(buffer, min(start + chunk_size, end), end)
+            for sack in buffer[start:stop].replace(b'\r\n', b'\n').split(BLANK_LINE):
+                if calories := sack.split():
+                    _push(heap, sum(map(int, calories)), k)
+            start = stop
+    return heap
+
+
+def top_elves(txt_filename: str, k: int = 3, workers: int = 1, min_parallel_size: int = PARALLEL_MIN_SIZE) -> list[int]:
+    """
+    Return the k largest totals of calories carried by an elf in descending order,
+    splitting the file between `workers` processes when there is more than one
+    and the file has at least `min_parallel_size` bytes.
+    """
+    size = pathlib.Path(txt_filename).stat().st_size
+    if not size:
+        return []
+    if workers <= 1 or size < min_parallel_size:
+        return sorted(_top_k_in_range(txt_filename, 0, size, k), reverse=True)
+    with open(txt_filename, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        cuts = sorted({0, size, *(_next_boundary(buffer, size * i // workers, size) for i in range(1, workers))})
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        heaps = executor.map(_top_k_in_range, itertools.repeat(txt_filename), cuts, cuts[1:], itertools.repeat(k))
+        return heapq.nlargest(k, itertools.chain.from_iterable(heaps))
+
+
 def solve_part1(puzzle_input: list[str]) -> int:
     """
     Group the lines and sum the lines converted into integers.
     Return the largest sum.
     """
-    return max(
-        sum(int(calories) for calories in sack)
-        for is_elf, sack in itertools.groupby(puzzle_input, key=lambda l: l != '')
-        if is_elf
-    )
+    return max(elf_totals(puzzle_input))
 
 
 def solve_part2(puzzle_input: list[str]) -> int:
     """
     Return the total of the top 3 largest sums.
     """
-    bundles: list[int] = [
-        sum(int(calories) for calories in sack)
-        for is_elf, sack in itertools.groupby(puzzle_input, key=lambda l: l != '')
-        if is_elf
-    ]
-    bundles.sort(reverse=True)
-    return sum(bundles[:3])
+    return sum(top_k(elf_totals(puzzle_input), 3))
 
 
 if __name__ == "__main__":
     title = 'Day 01: calorie counting'
     print(title.center(50, '-'))
 
+    # test the memory-mapped aggregator against the line-based solutions, also with CRLF line endings,
+    # with chunks and worker ranges that start anywhere, including inside a blank line
+    test = parse('day01_test.txt')
+    top3 = top_elves('day01_test.txt', k=3)
+    assert (top3[0], sum(top3)) == (solve_part1(test), solve_part2(test))
+    with tempfile.TemporaryDirectory() as directory:
+        crlf = pathlib.Path(directory, 'day01_test_crlf.txt')
+        crlf.write_bytes(pathlib.Path('day01_test.txt').read_bytes().replace(b'\n', b'\r\n'))
+        for filename in ('day01_test.txt', str(crlf)):
+            size = pathlib.Path(filename).stat().st_size
+            for chunk_size in range(1, size + 1):
+                assert sorted(_top_k_in_range(filename, 0, size, 3, chunk_size), reverse=True) == top3
+            for workers in (2, 3):
+                assert top_elves(filename, k=3, workers=workers, min_parallel_size=0) == top3
+        empty = pathlib.Path(directory, 'day01_empty.txt')
+        empty.touch()
+        assert top_elves(str(empty), k=3, workers=2, min_parallel_size=0) == []
+
     for file in sys.argv[1:]:
-        data = parse(file)
-        part1 = solve_part1(data)
-        part2 = solve_part2(data)
+        top3 = top_elves(file, k=3, workers=os.cpu_count() or 1)
+        part1, part2 = (top3[0] if top3 else 0), sum(top3)
         print(f"""{file}:
         Part 1: The most amount of calories carried by an elf is {part1}.
         Part 2: The total calories carried by the top three elves is {part2}.
         """)
-
-
-
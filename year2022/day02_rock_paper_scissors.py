@@ -3,9 +3,14 @@
 
 Usage example
     Advent_Of_Code/year2022 $ python day02_rock_paper_scissors.py day02_test.txt day02_input.txt
+
+There are only nine kinds of rounds, 'A X' to 'C Z', so each interpretation of the strategy guide is a table of
+nine scores. A guide is scored by counting each kind of round in the raw bytes with bytes.count()
+and taking the dot product of the counts with the table.
 """
 import sys
 import pathlib
+import itertools
 from typing import *
 from typing import List, Tuple
 
@@ -18,15 +23,90 @@ WIN_RULES: dict[int, int] = {
 LOSE_RULES: dict[int, int] = {v: k for k, v in WIN_RULES.items()}
 DRAW, LOSE, WIN = 3, 0, 6
 
+ROUNDS: tuple[bytes, ...] = tuple(f'{them} {me}'.encode() for them, me in itertools.product('ABC', 'XYZ'))
+ScoreTable = dict[bytes, int]
+CHUNK_SIZE = 1 << 24
+
+
+def _score_table(score: Callable[[int, int], int]) -> ScoreTable:
+    """
+    Return the score of each kind of round, given the score as a function of
+    the opponent's play and my column (both counted from 1).
+    """
+    return {
+        round_: score('ABC'.index(chr(round_[0])) + 1, 'XYZ'.index(chr(round_[2])) + 1)
+        for round_ in ROUNDS
+    }
+
+
+def _score_as_play(opponent_play: int, my_play: int) -> int:
+    return (
+        DRAW if opponent_play == my_play
+        else WIN if WIN_RULES[my_play] == opponent_play
+        else LOSE) + my_play
+
+
+def _score_as_result(opponent_play: int, result: int) -> int:
+    match result:
+        case 1:
+            return LOSE + WIN_RULES[opponent_play]
+        case 2:
+            return DRAW + opponent_play
+        case 3:
+            return WIN + LOSE_RULES[opponent_play]
+
+
+SCORE_TABLES: dict[str, ScoreTable] = {
+    'play': _score_table(_score_as_play),       # part 1: X, Y, Z are my play
+    'result': _score_table(_score_as_result),   # part 2: X, Y, Z are the result of the round
+}
+
+
+def parse(txt_filename: str) -> bytes:
+    return pathlib.Path(txt_filename).read_bytes()
 
-def parse(txt_filename: str) -> list[tuple[str, ...]]:
-    return [
-        tuple(line.strip().split(' '))
-        for line in pathlib.Path(txt_filename).read_text().splitlines()
-    ]
 
+def read_chunks(txt_filename: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the file in chunks of about `chunk_size` bytes that end on whole lines."""
+    with open(txt_filename, 'rb') as file:
+        rest = b''
+        while chunk := file.read(chunk_size):
+            chunk = rest + chunk
+            cut = chunk.rfind(b'\n') + 1
+            rest = chunk[cut:]
+            yield chunk[:cut]
+        yield rest
 
-def solve_part1(rounds: list[tuple[str, str]]) -> int:
+
+def count_rounds(chunks: Iterable[bytes]) -> dict[bytes, int]:
+    """Return how many of each kind of round are in the guide, given as chunks of whole lines."""
+    counts = dict.fromkeys(ROUNDS, 0)
+    for chunk in chunks:
+        for round_ in ROUNDS:
+            counts[round_] += chunk.count(round_)
+    return counts
+
+
+def score(counts: dict[bytes, int], table: ScoreTable) -> int:
+    """Return the total score of the rounds counted."""
+    return sum(counts[round_] * table[round_] for round_ in ROUNDS)
+
+
+def solve_part1(guide: bytes) -> int:
+    """
+    Return my total score if X, Y, and Z are respectively Rock, Paper, Scissors.
+    """
+    return score(count_rounds([guide]), SCORE_TABLES['play'])
+
+
+def solve_part2(guide: bytes) -> int:
+    """
+    Return my total score if X, Y, and Z are respectively a loss, a draw, and a win.
+    """
+    return score(count_rounds([guide]), SCORE_TABLES['result'])
+
+
+def _solve_part1_rounds(rounds: list[tuple[str, str]]) -> int:
     """
     They play A, B, or C, which are respectively Rock, Paper, Scissors.
     I play X, Y, or Z, which are respectively Rock, Paper, Scissors.
@@ -46,7 +126,7 @@ def solve_part1(rounds: list[tuple[str, str]]) -> int:
     return score
 
 
-def solve_part2(rounds: list[tuple[str, str]]) -> int:
+def _solve_part2_rounds(rounds: list[tuple[str, str]]) -> int:
     """
     'X' = I lose, 'Y' = 'I draw', 'Z' = 'I win'
     Everything else is the same as part 1.
@@ -69,10 +149,18 @@ if __name__ == '__main__':
     title = 'Day 02: Rock, Paper, Scissors'
     print(title.center(50, '-'))
 
+    # test the round histograms against scoring round by round, also from chunks of a few bytes
+    test = parse('day02_test.txt')
+    rounds = [tuple(line.strip().split(' ')) for line in test.decode().splitlines()]
+    answers = _solve_part1_rounds(rounds), _solve_part2_rounds(rounds)
+    assert (solve_part1(test), solve_part2(test)) == answers
+    counts = count_rounds(read_chunks('day02_test.txt', chunk_size=4))
+    assert (score(counts, SCORE_TABLES['play']), score(counts, SCORE_TABLES['result'])) == answers
+
     for path in sys.argv[1:]:
-        data = parse(path)
-        part1 = solve_part1(data)
-        part2 = solve_part2(data)
+        counts = count_rounds(read_chunks(path))
+        part1 = score(counts, SCORE_TABLES['play'])
+        part2 = score(counts, SCORE_TABLES['result'])
         print(f"""{path}:
         Part 1: The total score as played according to the strategy guide is {part1}.
         Part 2: The total score as played according to the new interpretation of the strategy guide is {part2}.
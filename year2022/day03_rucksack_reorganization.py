@@ -3,10 +3,16 @@
 
 Usage example
     Advent_Of_Code_2022 $ python day03_rucksack_reorganization.py day03_test.py day03_input.txt
+
+Items are encoded as bits: the item of priority p is bit p - 1 of a 52-bit mask, looked up per byte in ITEM_BITS.
+The items common to several rucksacks (or compartments) are then the AND of their masks,
+and the priority of a single common item is the bit_length() of the result.
 """
 import sys
 import string
 import itertools
+import functools
+import operator
 import pathlib
 from typing import *
 
@@ -16,6 +22,10 @@ PRIORITY_LEVEL: dict[str, int] = {
     letter: val + 1
     for val, letter in enumerate([*string.ascii_lowercase, *string.ascii_uppercase])
 }
+ITEM_BITS: list[int] = [
+    1 << (PRIORITY_LEVEL[chr(byte)] - 1) if chr(byte) in PRIORITY_LEVEL else 0
+    for byte in range(256)
+]
 
 
 def grouper(iterable: Iterable[T], n: int, fill: T = None) -> Iterator:
@@ -27,6 +37,52 @@ def grouper(iterable: Iterable[T], n: int, fill: T = None) -> Iterator:
     return itertools.zip_longest(*args, fillvalue=fill)
 
 
+def item_mask(items: bytes) -> int:
+    """Return the mask of the items, e.g. b'aC' is 0b100...01 with bits 0 and 28 set."""
+    return functools.reduce(operator.or_, map(ITEM_BITS.__getitem__, items), 0)
+
+
+def common_items(masks: Iterable[int]) -> int:
+    """Return the mask of the items common to all the masks."""
+    return functools.reduce(operator.and_, masks)
+
+
+def priority(mask: int) -> int:
+    """Return the priority level of the item in a mask holding a single item, or raise ValueError otherwise."""
+    if not mask or mask & (mask - 1):
+        raise ValueError(f'Expected exactly one common item, got the mask {mask:#b}.')
+    return mask.bit_length()
+
+
+def read_rucksacks(txt_filename: str) -> Iterator[bytes]:
+    """Yield the rucksacks of the file one line at a time."""
+    with open(txt_filename, 'rb') as file:
+        for line in file:
+            yield line.rstrip(b'\r\n')
+
+
+def reorganize(rucksacks: Iterable[bytes], group_size: int = 3) -> tuple[int, int]:
+    """
+    Return the sum of the priorities of the items shared by the two compartments of each rucksack and
+    the sum of the priorities of the badges common to each group of `group_size` rucksacks, in one pass.
+    A trailing group of fewer rucksacks counts the badge common to the rucksacks it has.
+    Raise ValueError if a rucksack's compartments or a group don't have exactly one item in common.
+    """
+    compartments_total, badges_total = 0, 0
+    group_mask, group_count = -1, 0
+    for rucksack in rucksacks:
+        half = len(rucksack) // 2
+        compartments_total += priority(item_mask(rucksack[:half]) & item_mask(rucksack[half:]))
+        group_mask &= item_mask(rucksack)
+        group_count += 1
+        if group_count == group_size:
+            badges_total += priority(group_mask)
+            group_mask, group_count = -1, 0
+    if group_count:
+        badges_total += priority(group_mask)
+    return compartments_total, badges_total
+
+
 def parse(txt_filename: str) -> list[str]:
     """
     Return a list of strings.
@@ -36,6 +92,20 @@ def parse(txt_filename: str) -> list[str]:
 
 
 def solve_part1(rucksacks: list[str]) -> int:
+    """
+    Return the sum of the priority levels of the items that appear in both compartments of each rucksack.
+    """
+    return reorganize(rucksack.encode() for rucksack in rucksacks)[0]
+
+
+def solve_part2(rucksacks: list[str]) -> int:
+    """
+    Return the sum of the priority levels of the items common to each group of three rucksacks.
+    """
+    return reorganize((rucksack.encode() for rucksack in rucksacks), group_size=3)[1]
+
+
+def _solve_part1_sets(rucksacks: list[str]) -> int:
     """
     Split each rucksack in equal-length compartments.
     Find the item (str) that appear in both compartments.
@@ -44,25 +114,19 @@ def solve_part1(rucksacks: list[str]) -> int:
     out: int = 0
     for rucksack in rucksacks:
         first, second = rucksack[:len(rucksack) // 2], rucksack[len(rucksack) // 2:]
-        item: str = set(first).intersection(set(second)).pop()
+        (item,) = set(first).intersection(set(second))
         out += PRIORITY_LEVEL[item]
     return out
 
 
-def solve_part2(rucksacks: list[str]) -> int:
+def _solve_part2_sets(rucksacks: list[str]) -> int:
     """
     Group rucksacks into groups of three and find the item common to all three in the group.
     Return the sum of the priority levels of the groups' common items.
     """
     out: int = 0
     for group in grouper(rucksacks, n=3):
-        first, second, third = group
-        badge: str = set(first)\
-            .intersection(
-                set(second)
-            ).intersection(
-                set(third)
-            ).pop()
+        (badge,) = set.intersection(*(set(rucksack) for rucksack in group if rucksack is not None))
         out += PRIORITY_LEVEL[badge]
     return out
 
@@ -71,10 +135,27 @@ if __name__ == '__main__':
     title = 'Day 03: Rucksack Reorganization'
     print(title.center(50, '-'))
 
+    # test the bitmasks against the sets
+    test = parse('day03_test.txt')
+    answers = _solve_part1_sets(test), _solve_part2_sets(test)
+    assert (solve_part1(test), solve_part2(test)) == reorganize(read_rucksacks('day03_test.txt')) == answers == (157, 70)
+
+    # groups of four, which leave a short group of two at the end
+    grouped = [b'aXbX', b'cXdX', b'eXfX', b'gXhX', b'iZjZ', b'kZlZ']
+    assert reorganize(grouped, group_size=4) == (4 * 50 + 2 * 52, 50 + 52)
+    assert common_items(map(item_mask, grouped[4:])) == ITEM_BITS[ord('Z')]
+
+    # badges with several common items or none
+    for rucksacks in (['abcb'], ['abcb', 'xbcb'], ['abcb', 'xyzy']):
+        for solve in (solve_part2, _solve_part2_sets):
+            try:
+                solve(rucksacks)
+                raise AssertionError(f'{solve.__name__}() should reject {rucksacks}')
+            except ValueError:
+                pass
+
     for path in sys.argv[1:]:
-        data = parse(path)
-        part1 = solve_part1(data)
-        part2 = solve_part2(data)
+        part1, part2 = reorganize(read_rucksacks(path))
         print(f"""{path}:
         Part 1: The sum of the priority levels is {part1}.
         Part 2: The sum of the priority levels of the badge items is {part2}.
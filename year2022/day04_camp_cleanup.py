@@ -3,33 +3,27 @@
 
 Usage example
     Advent_Of_Code/year2022 $ python day04_camp_cleanup.py day04_test.txt day04_input.txt
+
+Whether one assignment contains or overlaps the other only depends on the four endpoints,
+so contains() and overlaps() compare them directly instead of expanding the sections into sets.
+load_pairs() reads the whole file into an (n, 4) NumPy array, and count_pairs() counts both answers with vectorized comparisons.
+SectionCoverage answers how many assignments cover a section by bisecting sorted start and end sections (a sweep line).
 """
 import sys
 import pathlib
-import itertools
 from typing import *
 
+import numpy as np
+
+_SEPARATORS = bytes.maketrans(b'-,', b'  ')
 
-def parse(txt_filename: str) -> Iterable[tuple[int, ...]]:
+
+def parse(txt_filename: str) -> 'np.ndarray':
     """
     Each line of the file is '{left1}-{right1},{left2}-{right2}'.
-    Parse each line as a tuple of four integers.
+    Parse each line as a row of four integers, see load_pairs().
     """
-    pairs = []
-    for line in pathlib.Path(txt_filename).read_text().splitlines():
-        pairs.append(
-            tuple(
-                map(int,
-                    itertools.chain.from_iterable(
-                        map(
-                            lambda pair: tuple(pair.split('-')),
-                            line.strip('\n').split(',')
-                        )
-                    )
-                )
-            )
-        )
-    return pairs
+    return load_pairs(txt_filename)
 
 
 def expand_assignments(*pair) -> tuple[set[int], set[int]]:
@@ -41,7 +35,67 @@ def expand_assignments(*pair) -> tuple[set[int], set[int]]:
     return set(range(left1, right1 + 1)), set(range(left2, right2 + 1))
 
 
-def solve_part1(pairs: Iterable[tuple[int,...]]):
+def contains(left1: int, right1: int, left2: int, right2: int) -> bool:
+    """Return True if either assignment contains the other."""
+    return (left1 <= left2 and right2 <= right1) or (left2 <= left1 and right1 <= right2)
+
+
+def overlaps(left1: int, right1: int, left2: int, right2: int) -> bool:
+    """Return True if the assignments share at least one section."""
+    return left1 <= right2 and left2 <= right1
+
+
+def load_pairs(txt_filename: str) -> 'np.ndarray':
+    """
+    Return the pairs of assignments of the file as an (n, 4) array of (left1, right1, left2, right2).
+    """
+    text = pathlib.Path(txt_filename).read_bytes().translate(_SEPARATORS).decode()
+    return np.fromstring(text, dtype=np.int64, sep=' ').reshape(-1, 4)
+
+
+def count_pairs(pairs: 'np.ndarray') -> tuple[int, int]:
+    """
+    Return the number of pairs where one assignment contains the other and the number of pairs that overlap.
+    """
+    left1, right1, left2, right2 = pairs.T
+    contained = ((left1 <= left2) & (right2 <= right1)) | ((left2 <= left1) & (right1 <= right2))
+    overlapping = (left1 <= right2) & (left2 <= right1)
+    return int(np.count_nonzero(contained)), int(np.count_nonzero(overlapping))
+
+
+class SectionCoverage:
+    """
+    The assignments of all elves as sorted first and last sections,
+    so that the number of assignments covering a section is
+    the number of assignments starting at or before it minus the number of those ending before it.
+    """
+
+    def __init__(self, pairs: 'np.ndarray') -> None:
+        self.starts = np.sort(pairs[:, ::2], axis=None)
+        self.ends = np.sort(pairs[:, 1::2], axis=None)
+
+    def count(self, section: int) -> int:
+        """Return the number of assignments that cover the section."""
+        return int(np.searchsorted(self.starts, section, 'right') - np.searchsorted(self.ends, section, 'left'))
+
+    def count_many(self, sections: Iterable[int]) -> list[int]:
+        """Return the number of assignments that cover each of the sections."""
+        sections = sections if isinstance(sections, np.ndarray) else np.fromiter(sections, dtype=np.int64)
+        counts = np.searchsorted(self.starts, sections, 'right') - np.searchsorted(self.ends, sections, 'left')
+        return counts.tolist()
+
+
+def solve_part1(pairs: 'np.ndarray') -> int:
+    """Count how many pairs have one elf's sections properly contain the other elf's sections"""
+    return count_pairs(pairs)[0]
+
+
+def solve_part2(pairs: 'np.ndarray') -> int:
+    """Count how many pairs have any overlap at all"""
+    return count_pairs(pairs)[1]
+
+
+def _solve_part1_sets(pairs: Iterable[Sequence[int]]):
     """Count how many pairs have one elf's sections properly contain the other elf's sections"""
     counter: int = 0
     for pair in pairs:
@@ -50,7 +104,7 @@ def solve_part1(pairs: Iterable[tuple[int,...]]):
     return counter
 
 
-def solve_part2(pairs: Iterable[tuple[int, ...]]):
+def _solve_part2_sets(pairs: Iterable[Sequence[int]]):
     """Count how many pairs have any overlap at all"""
     counter: int = 0
     for pair in pairs:
@@ -63,6 +117,16 @@ if __name__ == '__main__':
     title = 'Day 04: Camp Cleanup'
     print(title.center(50, '-'))
 
+    # test the endpoint predicates and the vectorized counts against the set-based solutions
+    test = parse('day04_test.txt')
+    counts = _solve_part1_sets(test), _solve_part2_sets(test)
+    assert counts == (sum(contains(*pair) for pair in test), sum(overlaps(*pair) for pair in test))
+    assert counts == (solve_part1(test), solve_part2(test)) == (2, 4)
+    assert SectionCoverage(test).count_many(range(0, 10)) == [
+        sum(left <= section <= right for pair in test for left, right in (pair[:2], pair[2:]))
+        for section in range(0, 10)
+    ]
+
     for path in sys.argv[1:]:
         data = parse(path)
         part1 = solve_part1(data)
@@ -3,19 +3,30 @@
 
 Usage example:
     Advent_Of_Code_/year022 $ python day05_supply_stack.py day05_test.txt day05_input.txt
+
+CrateStacks keeps each stack as a list of segments, i.e. slices of shared crate lists that may be read backwards.
+Moving n crates detaches the segments on top of the source stack (splitting at most one of them) and attaches them
+to the target stack, so a move costs O(segments touched) instead of O(n). The CrateMover 9000 moves crates one at a time,
+which reverses them, so its moves reverse the order of the moved segments and flip each one's direction
+instead of copying any crates.
 """
 import sys
 import pathlib
 import itertools
 import collections
+import random
 import re
+import string
 from typing import *
 
 Stacks = dict[int, list[str]]
 Movement = collections.namedtuple('Movement', ['n', 'from_stack', 'to_stack'])
 
-CRATE_PATTERN: re.Pattern = re.compile("\[(?P<letter>[A-Z])\]")
-MOVE_PATTERN: re.Pattern = re.compile("move (?P<n>[\d]+) from (?P<from>[1-9]) to (?P<to>[1-9])")
+CRATE_PATTERN: re.Pattern = re.compile(r"\[(?P<letter>[A-Z])\]")
+MOVE_PATTERN: re.Pattern = re.compile(r"move (?P<n>\d+) from (?P<from>\d+) to (?P<to>\d+)")
+# a move copies the crates into a single segment when it is small or would move too many segments,
+# so that the stacks don't fragment into ever smaller segments
+COALESCE_SIZE, COALESCE_SEGMENTS = 64, 16
 
 
 def parse_stacks(stack_layers: list[str]) -> Stacks:
@@ -38,34 +49,129 @@ def parse_stacks(stack_layers: list[str]) -> Stacks:
     return stacks
 
 
-def parse_instructions(instructions: list[str]) -> Iterator[Movement]:
+def parse_instructions(instructions: str) -> Iterator[Movement]:
     """
-    Given a list of movement statements, parse each statement by matching MOVE_PATTERN
-    and extracting the matched groups.
+    Given the movement statements, find every match of MOVE_PATTERN in one pass over the text.
     Yield the tuple of matched substrings as Movement object.
     """
-    for line in instructions:
-        matched = re.match(MOVE_PATTERN, line)
-        yield Movement(int(matched.group('n')), int(matched.group('from')), int(matched.group('to')))
+    for matched in MOVE_PATTERN.finditer(instructions):
+        yield Movement(*map(int, matched.groups()))
 
 
-def parse(txt_filename: str) -> tuple[list[str], list[str]]:
+def parse(txt_filename: str) -> tuple[list[str], str]:
     """
     The file content is a 2d view of stacks, an empty line break, and a sequence of movements.
-    Use itertools.takewhile() to split the file content into before and after the empty line break (without including the line break).
+    Split the file content at the empty line break into the layers of the stacks and the text of the movements.
     """
-    it = iter(pathlib.Path(txt_filename).read_text().splitlines())
-    stack_layers = [
-        line.strip('\n')
-        for line in itertools.takewhile(lambda line: line != '\n', it)
-        ]
-    instructions = [
-        line.strip() for line in it
-    ]
-    return stack_layers, instructions
+    drawing, _, instructions = pathlib.Path(txt_filename).read_text().partition('\n\n')
+    return drawing.splitlines(), instructions
 
 
-def solve_part1(initial_stack_layers: list[str], instructions: list[str]) -> str:
+class Segment:
+    """
+    The crates `crates[start:stop]` from bottom to top, or from top to bottom if `reverse`.
+    """
+    __slots__ = 'crates', 'start', 'stop', 'reverse'
+
+    def __init__(self, crates: list[str], start: int, stop: int, reverse: bool = False) -> None:
+        self.crates = crates
+        self.start = start
+        self.stop = stop
+        self.reverse = reverse
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def to_list(self) -> list[str]:
+        """Return the crates from bottom to top."""
+        crates = self.crates[self.start:self.stop]
+        return crates[::-1] if self.reverse else crates
+
+    @property
+    def top(self) -> str:
+        return self.crates[self.start] if self.reverse else self.crates[self.stop - 1]
+
+    def split_top(self, n: int) -> 'Segment':
+        """Detach and return the top n crates of the segment."""
+        if self.reverse:
+            self.start += n
+            return Segment(self.crates, self.start - n, self.start, True)
+        self.stop -= n
+        return Segment(self.crates, self.stop, self.stop + n, False)
+
+
+class CrateStacks:
+    """
+    Stacks of crates stored as lists of segments from bottom to top.
+    """
+
+    def __init__(self, stacks: Stacks) -> None:
+        self.stacks: dict[int, list[Segment]] = {
+            index: [Segment(list(crates), 0, len(crates))] if crates else [] for index, crates in stacks.items()
+        }
+        self.sizes: dict[int, int] = {index: len(crates) for index, crates in stacks.items()}
+
+    def move(self, n: int, from_stack: int, to_stack: int, keep_order: bool) -> None:
+        """
+        Move the top n crates of a stack onto another, one at a time (CrateMover 9000)
+        or, if `keep_order`, all at once (CrateMover 9001).
+        """
+        if n > self.sizes[from_stack]:
+            raise IndexError(f"Stack {from_stack} has fewer than {n} crates.")
+        source, taken, remaining = self.stacks[from_stack], [], n
+        while remaining:
+            if len(source[-1]) <= remaining:
+                taken.append(source.pop())
+                remaining -= len(taken[-1])
+            else:
+                taken.append(source[-1].split_top(remaining))
+                remaining = 0
+        # taken holds the moved segments from top to bottom
+        if len(taken) > 1 and (n <= COALESCE_SIZE or len(taken) > COALESCE_SEGMENTS):
+            crates = list(itertools.chain.from_iterable(segment.to_list() for segment in reversed(taken)))
+            taken = [Segment(crates, 0, n, not keep_order)]
+        elif keep_order:
+            taken.reverse()
+        else:
+            for segment in taken:
+                segment.reverse = not segment.reverse
+        self.stacks[to_stack].extend(taken)
+        self.sizes[from_stack] -= n
+        self.sizes[to_stack] += n
+
+    def crates(self, index: int) -> list[str]:
+        """Return the crates of a stack from bottom to top."""
+        return list(itertools.chain.from_iterable(segment.to_list() for segment in self.stacks[index]))
+
+    def tops(self) -> str:
+        """Return the crates on top of the stacks, skipping empty stacks."""
+        return ''.join(segments[-1].top for segments in self.stacks.values() if segments)
+
+
+def _move_all(initial_stack_layers: list[str], instructions: str, keep_order: bool) -> str:
+    stacks = CrateStacks(parse_stacks(initial_stack_layers))
+    for move in parse_instructions(instructions):
+        stacks.move(*move, keep_order=keep_order)
+    return stacks.tops()
+
+
+def solve_part1(initial_stack_layers: list[str], instructions: str) -> str:
+    """
+    Move the crates according to the instructions. Crates can only be moved one at a time.
+    """
+    return _move_all(initial_stack_layers, instructions, keep_order=False)
+
+
+def solve_part2(initial_stack_layers: list[str], instructions: str) -> str:
+    """
+    Move the crates according to the instructions.
+    Multiple crates are moved at once, but when they are replaced to another stack,
+    they retain the same order they were stacked in the original stack.
+    """
+    return _move_all(initial_stack_layers, instructions, keep_order=True)
+
+
+def _solve_part1_lists(initial_stack_layers: list[str], instructions: str) -> str:
     """
     Move the crates according to the instructions. Crates can only be moved one at a time.
     """
@@ -79,7 +185,7 @@ def solve_part1(initial_stack_layers: list[str], instructions: list[str]) -> str
     )
 
 
-def solve_part2(initial_stack_layers: list[str], instructions: list[str]) -> str:
+def _solve_part2_lists(initial_stack_layers: list[str], instructions: str) -> str:
     """
     Move the crates according to the instructions.
     Multiple crates are moved at once, but when they are replaced to another stack,
@@ -96,10 +202,39 @@ def solve_part2(initial_stack_layers: list[str], instructions: list[str]) -> str
     )
 
 
+def generate_rearrangement(n_stacks: int, height: int, n_moves: int, max_n: int, seed: int = 5) -> tuple[list[str], str]:
+    """
+    Return the stack layers and the movements of a random rearrangement in the format of parse(),
+    starting from `n_stacks` stacks of `height` crates and moving up to `max_n` crates at a time.
+    Every stack keeps at least one crate.
+    """
+    rng = random.Random(seed)
+    layers = [' '.join(f'[{rng.choice(string.ascii_uppercase)}]' for _ in range(n_stacks)) for _ in range(height)]
+    layers.append(' '.join(f' {index} ' for index in range(1, n_stacks + 1)))
+    sizes, moves = [height] * n_stacks, []
+    for _ in range(n_moves):
+        from_stack = rng.choice([i for i, size in enumerate(sizes) if size > 1])
+        to_stack = rng.choice([i for i in range(n_stacks) if i != from_stack])
+        n = rng.randint(1, min(max_n, sizes[from_stack] - 1))
+        sizes[from_stack] -= n
+        sizes[to_stack] += n
+        moves.append(f'move {n} from {from_stack + 1} to {to_stack + 1}')
+    return layers, '\n'.join(moves)
+
+
 if __name__ == '__main__':
     title = 'Day 05: Supply Stacks'
     print(title.center(50, '-'))
 
+    # test the segment stacks against moving crates in lists
+    test = parse('day05_test.txt')
+    assert (solve_part1(*test), solve_part2(*test)) == (_solve_part1_lists(*test), _solve_part2_lists(*test))
+    # moves of more than COALESCE_SIZE crates, which keep their segments
+    for seed in range(10):
+        rearrangement = generate_rearrangement(9, 200, 300, 4 * COALESCE_SIZE, seed)
+        assert solve_part1(*rearrangement) == _solve_part1_lists(*rearrangement)
+        assert solve_part2(*rearrangement) == _solve_part2_lists(*rearrangement)
+
     for path in sys.argv[1:]:
         data = parse(path)
         part1 = solve_part1(*data)
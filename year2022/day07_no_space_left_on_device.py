@@ -7,17 +7,27 @@ Usage example:
 The code assumes that
     a) the same directory is never opened twice;
     b) there can be duplicate sub-folder names in different parent folders.
+
+index_log() reads the terminal log one line at a time, so it can stream transcripts that don't fit in memory.
+Directories are interned to integer ids by (parent id, name), and each file size is added to the current directory
+only; the sizes not yet passed on are rolled up to the parent on `cd ..` (and all the way up on `cd /` or at the end).
+The resulting DirectoryIndex keeps the tree in flat arrays plus a sorted copy of the sizes, which answers
+"all directories of at most N" and "the smallest directory of at least M" with a bisection.
 """
 import sys
 import pathlib
 import collections
 import itertools
+import bisect
 import re
+from array import array
+from typing import *
 
 CD_PATTERN = re.compile(r'^\$ cd (?P<dir>\S+)$')
 LS_PATTERN = re.compile(r'^\$ ls$')
 FILE_PATTERN = re.compile(r'^(?P<filesize>\d+) (?P<filename>\S+)$')
 DIR_PATTERN = re.compile(r'^dir (?P<dir>\w+)$')
+MAX_SIZE, TOTAL, REQUIRED_UNUSED = 100000, 70000000, 30000000
 
 
 def parse(txt_filename: str) -> list[str]:
@@ -27,6 +37,89 @@ def parse(txt_filename: str) -> list[str]:
     return pathlib.Path(txt_filename).read_text().splitlines()
 
 
+def read_log(txt_filename: str) -> Iterator[str]:
+    """
+    Yield the lines of the terminal log one at a time.
+    """
+    with open(txt_filename) as file:
+        for line in file:
+            yield line.rstrip('\n')
+
+
+class DirectoryIndex:
+    """
+    Directory sizes in an array-backed tree; directory 0 is the outermost directory `/`.
+    """
+
+    def __init__(self, parents: array, sizes: array) -> None:
+        self.parents = parents
+        self.sizes = sizes
+        self.sorted_sizes = array('q', sorted(sizes))
+        self.prefix_sums = array('q', itertools.accumulate(self.sorted_sizes, initial=0))
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    @property
+    def root_size(self) -> int:
+        return self.sizes[0]
+
+    def at_most(self, max_size: int) -> array:
+        """Return the sizes of all directories of at most `max_size`, in ascending order."""
+        return self.sorted_sizes[:bisect.bisect_right(self.sorted_sizes, max_size)]
+
+    def total_at_most(self, max_size: int) -> int:
+        """Return the sum of sizes of all directories of at most `max_size`."""
+        return self.prefix_sums[bisect.bisect_right(self.sorted_sizes, max_size)]
+
+    def smallest_at_least(self, min_size: int) -> int:
+        """Return the size of the smallest directory of at least `min_size`."""
+        i = bisect.bisect_left(self.sorted_sizes, min_size)
+        if i == len(self.sorted_sizes):
+            raise ValueError(f"No directory is at least {min_size} in size.")
+        return self.sorted_sizes[i]
+
+
+def index_log(lines: Iterable[str]) -> DirectoryIndex:
+    """
+    Return the DirectoryIndex of the directories opened in the terminal log, consuming the lines in one pass.
+    """
+    ids: dict[tuple[int, str], int] = {}
+    parents, sizes, pending = array('q', [-1]), array('q', [0]), array('q', [0])
+    branch_path = [0]
+
+    def roll_up() -> None:
+        child = branch_path.pop()
+        parent = branch_path[-1]
+        sizes[parent] += pending[child]
+        pending[parent] += pending[child]
+        pending[child] = 0
+
+    for line in lines:
+        if line.startswith('$ cd '):
+            dirname = line[5:]
+            if dirname == '..':
+                roll_up()
+            elif dirname == '/':
+                while len(branch_path) > 1:
+                    roll_up()
+            else:
+                key = branch_path[-1], dirname
+                if key not in ids:
+                    ids[key] = len(sizes)
+                    parents.append(branch_path[-1])
+                    sizes.append(0)
+                    pending.append(0)
+                branch_path.append(ids[key])
+        elif line[:1].isdigit():
+            filesize = int(line[:line.index(' ')])
+            sizes[branch_path[-1]] += filesize
+            pending[branch_path[-1]] += filesize
+    while len(branch_path) > 1:
+        roll_up()
+    return DirectoryIndex(parents, sizes)
+
+
 def _walk(commands: list[str]) -> dict[str, int]:
     """
     Return a mapping of directory to the total of their content file sizes.
@@ -58,7 +151,24 @@ def _walk(commands: list[str]) -> dict[str, int]:
     return directory_sizes
 
 
-def solve_part1(puzzle_input: list[str]) -> int:
+def solve_part1(index: DirectoryIndex) -> int:
+    """
+    The puzzle input is the terminal commands indexed by index_log().
+    Return the sum of sizes of directories whose total size is at most MAX_SIZE.
+    """
+    return index.total_at_most(MAX_SIZE)
+
+
+def solve_part2(index: DirectoryIndex) -> int:
+    """
+    Like solve_part1(), take the terminal commands indexed by index_log().
+    Return the size of the smallest directory that would free up enough space so that
+    the disk can meet the required unused space out of the total disk space.
+    """
+    return index.smallest_at_least(REQUIRED_UNUSED - (TOTAL - index.root_size))
+
+
+def _solve_part1_walk(puzzle_input: list[str]) -> int:
     """
     The puzzle input is the terminal commands, which will be passed into _walk() to
     get a mapping of directories and their content file sizes.
@@ -69,9 +179,9 @@ def solve_part1(puzzle_input: list[str]) -> int:
     return sum(size for size in directory_sizes.values() if size <= MAX_SIZE)
 
 
-def solve_part2(puzzle_input: list[str]) -> int:
+def _solve_part2_walk(puzzle_input: list[str]) -> int:
     """
-    Like solve_part1(), get a mapping of directory paths and their content file sizes
+    Like _solve_part1_walk(), get a mapping of directory paths and their content file sizes
     by passing the puzzle input into _walk().
     Return the size of the smallest directory that would free up enough space so that
     the disk can meet the required unused space out of the total disk space.
@@ -91,10 +201,16 @@ if __name__ == '__main__':
     title = 'Day 07: No Space Left on Device'
     print(title.center(50, '-'))
 
+    # test the streaming index against _walk()
+    test = parse('day07_test.txt')
+    index = index_log(read_log('day07_test.txt'))
+    assert sorted(index.sizes) == sorted(_walk(test).values())
+    assert (solve_part1(index), solve_part2(index)) == (_solve_part1_walk(test), _solve_part2_walk(test))
+
     for path in sys.argv[1:]:
-        data = parse(path)
-        part1 = solve_part1(data)
-        part2 = solve_part2(data)
+        index = index_log(read_log(path))
+        part1 = solve_part1(index)
+        part2 = solve_part2(index)
         print(f"""{path}:
         Part 1: The size of the largest directory that is at most 100000 is {part1}.
         Part 2: The size of the smallest directory that would free up enough space to meet the required unused disk space is {part2}.
@@ -3,11 +3,16 @@
 
 Usage example:
     Advent_Of_Code/year2022 $ python day08_treetop_tree_house.py day08_test.txt day08_input.txt
+
+Forest.survey() looks along every row and column once in each of the four directions.
+A running maximum tells whether a tree is taller than every tree before it (i.e. visible from that side),
+and a monotonic stack of the trees not yet blocked gives how far the tree can see back along the line.
 """
 import sys
 import pathlib
 import math
 import collections
+from array import array
 from typing import *
 
 T = TypeVar('T')
@@ -83,7 +88,7 @@ class Grid(dict):
 def _tree_line(grid: Grid, tree: Coord, direction: Vector) -> Iterator[Coord]:
     while True:
         tree = _add_vectors(tree, direction)
-        if grid.get(tree, None):
+        if tree in grid:
             yield tree
         else:
             return
@@ -121,11 +126,78 @@ def _scenic_score(grid: Grid, ref_coord: Coord, ref_height: int, direction: Vect
             return n + (1 if ref_height <= grid[last_tree] else 0)
 
 
+class Survey(NamedTuple):
+    visible: bytearray      # 1 if the tree is visible from outside the forest
+    scenic_scores: array    # product of the viewing distances in the four directions
+
+
+class Forest:
+    """
+    Tree heights of a forest in a flat row-major bytearray.
+    """
+
+    def __init__(self, lines: list[str]) -> None:
+        self.height = len(lines)
+        self.width = len(lines[0]) if lines else 0
+        self.trees = bytearray(ord(h) - ord('0') for line in lines for h in line)
+
+    def _lines_of_sight(self) -> Iterator[range]:
+        """
+        Yield the flat indices of every row and column of trees, in each of the four directions.
+        """
+        width, size = self.width, len(self.trees)
+        for start in range(0, size, width):
+            yield range(start, start + width)
+            yield range(start + width - 1, start - 1, -1)
+        for start in range(width):
+            yield range(start, size, width)
+            yield range(size - width + start, -1, -width)
+
+    def survey(self) -> Survey:
+        """
+        Return whether each tree is visible and its scenic score,
+        from one linear pass over the forest per direction.
+        """
+        trees = self.trees
+        visible = bytearray(len(trees))
+        scenic_scores = array('q', [1]) * len(trees)
+        for line in self._lines_of_sight():
+            tallest = -1
+            stack: list[int] = []   # positions in line of the trees that still block the view, from tallest to shortest
+            heights: list[int] = []
+            for position, i in enumerate(line):
+                height = trees[i]
+                if height > tallest:
+                    visible[i] = 1
+                    tallest = height
+                while heights and heights[-1] < height:
+                    heights.pop()
+                    stack.pop()
+                scenic_scores[i] *= position - stack[-1] if stack else position
+                stack.append(position)
+                heights.append(height)
+        return Survey(visible, scenic_scores)
+
+
 def parse(txt_filename: str) -> list[str]:
     return pathlib.Path(txt_filename).read_text().splitlines()
 
 
-def solve_part1(puzzle_input: list[str]) -> int:
+def solve_part1(survey: Survey) -> int:
+    """
+    Count the number of trees that are visible from at least one of the DIRECTIONS4.
+    """
+    return survey.visible.count(1)
+
+
+def solve_part2(survey: Survey) -> int:
+    """
+    Return the highest scenic score possible in this forest.
+    """
+    return max(survey.scenic_scores)
+
+
+def _solve_part1_lines(puzzle_input: list[str]) -> int:
     """
     Count the number of trees that are visible from at least one of the DIRECTIONS4.
     """
@@ -143,7 +215,7 @@ def solve_part1(puzzle_input: list[str]) -> int:
     )
 
 
-def solve_part2(puzzle_input: list[str]) -> int:
+def _solve_part2_lines(puzzle_input: list[str]) -> int:
     """
     Return the highest scenic score possible in this forest.
     """
@@ -161,10 +233,15 @@ if __name__ == '__main__':
     title = 'Day 08: Treetop Tree House'
     print(title.center(50, '-'))
 
+    # test the survey against walking every line of sight
+    test = parse('day08_test.txt')
+    survey = Forest(test).survey()
+    assert (solve_part1(survey), solve_part2(survey)) == (_solve_part1_lines(test), _solve_part2_lines(test))
+
     for path in sys.argv[1:]:
-        data = parse(path)
-        part1 = solve_part1(data)
-        part2 = solve_part2(data)
+        survey = Forest(parse(path)).survey()
+        part1 = solve_part1(survey)
+        part2 = solve_part2(survey)
         print(f"""{path}:
         Part 1: The number of trees visible from outside the grid are {part1}.
         Part 2: The highest scenic score in this forest grid is {part2}.
@@ -3,6 +3,10 @@
 
 Usage example:
     Advent_Of_Code/year2022 $ python day09_rope_bridge.py day09_test.txt day09_input.txt
+
+simulate() moves the whole rope one step at a time, straight from the commands, without any history:
+each knot follows the one before it, and as soon as a knot doesn't move, none of the knots behind it do either.
+Visited positions are recorded only for the knots asked for, as ints packed from (row, column).
 """
 import sys
 import pathlib
@@ -36,6 +40,45 @@ def parse(txt_filename: str) -> list[Command]:
     ]
 
 
+def read_commands(txt_filename: str) -> Iterator[Command]:
+    """Yield the commands of the file one line at a time."""
+    with open(txt_filename) as file:
+        for line in file:
+            direction, n = line.split()
+            yield direction, int(n)
+
+
+def _pack(row: int, column: int) -> int:
+    """Return the coordinate as a single int, which is unique as long as abs(column) < 2 ** 31."""
+    return (row << 32) + column
+
+
+def simulate(commands: Iterable[Command], n_knots: int = 2, tracked: Iterable[int] = (-1,)) -> dict[int, set[int]]:
+    """
+    Pull a rope of `n_knots` knots by its head (knot 0) according to the commands.
+    Return the packed coordinates visited by each of the tracked knots (negative indices count from the tail).
+    """
+    rows, columns = [0] * n_knots, [0] * n_knots
+    visited = {knot % n_knots: {_pack(0, 0)} for knot in tracked}
+    is_tracked = [knot in visited for knot in range(n_knots)]
+    for direction, n in commands:
+        drow, dcol = LOOKUP[direction]
+        for _ in range(n):
+            rows[0] += drow
+            columns[0] += dcol
+            if is_tracked[0]:
+                visited[0].add(_pack(rows[0], columns[0]))
+            for knot in range(1, n_knots):
+                dy, dx = rows[knot - 1] - rows[knot], columns[knot - 1] - columns[knot]
+                if -1 <= dy <= 1 and -1 <= dx <= 1:
+                    break
+                rows[knot] += (dy > 0) - (dy < 0)
+                columns[knot] += (dx > 0) - (dx < 0)
+                if is_tracked[knot]:
+                    visited[knot].add(_pack(rows[knot], columns[knot]))
+    return visited
+
+
 def _add_vectors(vector1: Vector, vector2: Vector) -> Vector:
     return vector1[ROW] + vector2[ROW], vector1[COLUMN] + vector2[COLUMN]
 
@@ -56,17 +99,35 @@ def _update_tail_coord(tail: Coord, head: Coord) -> Coord:
     drow, dcol = (head[ROW] - tail[ROW]), (head[COLUMN] - tail[COLUMN])
     if abs(drow) <= 1 and abs(dcol) <= 1:
         return tail
-    elif abs(drow) > 1 or abs(dcol) > 1:
-        return _add_vectors(
-            tail,
-            (
-                1 * int(drow/abs(drow)) if drow != 0 else 0,
-                1 * int(dcol/abs(dcol)) if dcol != 0 else 0
-            )
-        )
+    else:
+        return _add_vectors(tail, ((drow > 0) - (drow < 0), (dcol > 0) - (dcol < 0)))
+
+
+def simulate_rope(commands: Iterable[Command]) -> dict[int, set[int]]:
+    """
+    Return the coordinates visited by knots 1 and 9 of a ten-knot rope, which answer both parts in one simulation:
+    the second knot of a ten-knot rope moves exactly like the tail of a two-knot rope.
+    """
+    return simulate(commands, 10, tracked=(1, 9))
 
 
-def solve_part1(puzzle_input: list[Command]) -> int:
+def solve_part1(visited: dict[int, set[int]]) -> int:
+    """
+    Count the number of coordinates the tail visits as its coordinate is updated by the head's movement,
+    given the knots' visits from simulate_rope().
+    """
+    return len(visited[1])
+
+
+def solve_part2(visited: dict[int, set[int]]) -> int:
+    """
+    Same as part 1, but now there are nine tail knots.
+    Count the number of coordinates visited by the 9th tail knot.
+    """
+    return len(visited[9])
+
+
+def _solve_part1_history(puzzle_input: list[Command]) -> int:
     """
     Count the number of coordinates the tail visits as its coordinate is updated by the head's movement.
     """
@@ -77,7 +138,7 @@ def solve_part1(puzzle_input: list[Command]) -> int:
     return len(set(tail_history))
 
 
-def solve_part2(puzzle_input: list[Command]) -> int:
+def _solve_part2_history(puzzle_input: list[Command]) -> int:
     """
     Same as part 1, but now there are nine tail knots.
     Count the number of coordinates visited by the 9th tail knot.
@@ -96,10 +157,16 @@ if __name__ == '__main__':
     title = 'Day 09: Rope Bridge'
     print(title.center(50, '-'))
 
+    # test the single-pass simulation against the knot histories
+    test = parse('day09_test.txt')
+    visited = simulate_rope(test)
+    assert (solve_part1(visited), solve_part2(visited)) == (_solve_part1_history(test), _solve_part2_history(test))
+    assert solve_part1(visited) == len(simulate(test, 2)[1])
+
     for path in sys.argv[1:]:
-        data = parse(path)
-        part1 = solve_part1(data)
-        part2 = solve_part2(data)
+        visited = simulate_rope(read_commands(path))
+        part1 = solve_part1(visited)
+        part2 = solve_part2(visited)
         print(f"""{path}:
         Part 1: The tail visits {part1} different locations at least once.
         Part 2: The ninth tail visits {part2} different locations at least once.
@@ -3,14 +3,21 @@
 
 Usage example:
     Advent_Of_Code/year2022 $ python day10_cathode_ray_tube.py day10_test.txt day10_input.txt
+
+compile_trace() turns the program into runs of cycles during which the X register holds the same value,
+so the register during any cycle is a bisection into the first cycles of the runs,
+and the screen is drawn by lighting the (at most three) pixels of each run that the sprite covers on each row.
 """
 import sys
 import pathlib
 import functools
 import itertools
+import bisect
+from array import array
 from typing import *
 
 SCREEN_WIDTH: int = 40
+SIGNAL_CYCLES = range(20, 220 + 1, 40)
 LIT, DARK = '#', '.'
 ADDX = 'addx'
 
@@ -38,16 +45,91 @@ def _execute_program(commands: list[list[str]]) -> Iterator[int]:
         yield X
 
 
-def solve_part1(puzzle_input: list[list[str]]) -> int:
+class RegisterTrace:
+    """
+    The X register over the cycles of a program, as runs starting at `starts[i]` (cycles counted from 1)
+    during which X is `values[i]`.
+    """
+
+    def __init__(self, starts: array, values: array, cycles: int) -> None:
+        self.starts = starts
+        self.values = values
+        self.cycles = cycles
+
+    def x_during(self, cycle: int) -> int:
+        """Return the X register during the cycle; after the program ends, X keeps its last value."""
+        if cycle < 1:
+            raise ValueError(f"Cycles start counting from 1, got {cycle}.")
+        return self.values[bisect.bisect_right(self.starts, cycle) - 1]
+
+    def signal_strength(self, cycles: Iterable[int]) -> int:
+        """Return the sum of each cycle number multiplied by the X register during that cycle."""
+        return sum(cycle * self.x_during(cycle) for cycle in cycles)
+
+    def render(self, width: int = SCREEN_WIDTH, rows: Optional[int] = None) -> str:
+        """
+        Return the image drawn on a screen `width` pixels wide, where the pixel at position i is drawn during cycle i + 1.
+        By default, draw as many complete rows as the program has cycles for.
+        """
+        rows = self.cycles // width if rows is None else rows
+        ends = itertools.chain(self.starts[1:], [rows * width + 1])
+        screen = [bytearray(DARK.encode()) * width for _ in range(rows)]
+        for start, end, X in zip(self.starts, ends, self.values):
+            # the run draws the positions [start - 1, end - 1), possibly over several rows
+            first, last = start - 1, min(end - 1, rows * width)
+            for row in range(first // width, (last - 1) // width + 1 if last > first else 0):
+                low = max(first - row * width, X - 1, 0)
+                high = min(last - row * width, X + 2, width)
+                if low < high:
+                    screen[row][low:high] = LIT.encode() * (high - low)
+        return '\n'.join(line.decode() for line in screen)
+
+
+def compile_trace(commands: Iterable[list[str]]) -> RegisterTrace:
+    """
+    Return the RegisterTrace of the program; X starts at 1 and addx updates it at the end of its second cycle.
+    """
+    starts, values = array('q', [1]), array('q', [1])
+    cycle, X = 1, 1
+    for command in commands:
+        op, *args = command
+        if op == ADDX:
+            cycle += 2
+            if int(args[0]):
+                X += int(args[0])
+                starts.append(cycle)
+                values.append(X)
+        else:
+            cycle += 1
+    return RegisterTrace(starts, values, cycle - 1)
+
+
+def solve_part1(trace: RegisterTrace) -> int:
+    """
+    Add the X register during the cycle multiplied by the cycle number for
+    cycles in SIGNAL_CYCLES, given the program compiled by compile_trace().
+    """
+    return trace.signal_strength(SIGNAL_CYCLES)
+
+
+def solve_part2(trace: RegisterTrace) -> str:
+    """
+    Draw pixels according to the cycle number and the X register during the cycle,
+    on a screen SCREEN_WIDTH pixels wide.
+    """
+    return trace.render(SCREEN_WIDTH)
+
+
+def _solve_part1_cycles(puzzle_input: list[list[str]]) -> int:
     """
     Execute the program by feeding the puzzle input to _execute_program.
     Add the X register during the cycle multiplied by the cycle number for
-    cycles in `range(20, 220+1, 40)`.
+    cycles in SIGNAL_CYCLES.
     Cycles start counting from 1.
     """
     return sum(
         i * cycle for i, cycle in enumerate(_execute_program(puzzle_input), start=1)
-        if i in range(20, 220 + 1, 40)
+        if i in SIGNAL_CYCLES
     )
 
 
@@ -58,7 +140,7 @@ def _draw_pixel(position: int, X: int) -> str:
     return LIT if position % SCREEN_WIDTH in (X-1, X, X+1) else DARK
 
 
-def solve_part2(puzzle_input: list[list[str]]) -> str:
+def _solve_part2_cycles(puzzle_input: list[list[str]]) -> str:
     """
     Like part1, feed the puzzle_input into _execute_program().
     Draw pixels according to the cycle number and the X register during the cycle.
@@ -79,10 +161,15 @@ if __name__ == '__main__':
     title = 'Day 10: Cathode Ray Tube'
     print(title.center(50, '-'))
 
+    # test the register trace against executing the program cycle by cycle
+    test = parse('day10_test.txt')
+    trace = compile_trace(test)
+    assert (solve_part1(trace), solve_part2(trace)) == (_solve_part1_cycles(test), _solve_part2_cycles(test))
+
     for path in sys.argv[1:]:
-        data = parse(path)
-        part1 = solve_part1(data)
-        part2 = solve_part2(data)
+        trace = compile_trace(parse(path))
+        part1 = solve_part1(trace)
+        part2 = solve_part2(trace)
         print(f"""{path}:
         Part 1: The total strength of the six cycles is {part1}.
         Part 2: The letters displayed on the screen are\n{part2}.
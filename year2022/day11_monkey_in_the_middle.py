@@ -10,6 +10,13 @@ Two lessons:
     2. When you're changing the data of other items in the list while iterating through the list,
     things get messed up. You can't keep track of the items just by taking their index in enumerate().
     Hash their items out in a separate variable.
+
+`_simulate()` interprets each Monkey for every item it throws. `_compile()` turns a Monkey into an opcode
+with its operand already parsed, which two faster simulations use:
+    - `_simulate_batches()` applies each monkey's opcode to all its items at once as a NumPy int64 array;
+    - `_simulate_periodic()` follows each item on its own, because an item's (worry level, holder) at the start
+    of a round decides its whole future and repeats within finitely many rounds. Once an item's cycle is found,
+    the inspections over any number of rounds are computed without simulating them.
 """
 import sys
 import pathlib
@@ -21,6 +28,8 @@ import dataclasses
 import math
 from typing import *
 
+import numpy as np
+
 T = TypeVar('T')
 Result = collections.namedtuple('Result', ['monkey', 'items'])
 Formula = Callable[Sequence, tuple[Result, Result]]
@@ -107,14 +116,119 @@ def _simulate(monkeys: list[Monkey], n: int, relief: int = 1) -> int:
     return math.prod(v for _, v in inspected.most_common(2))
 
 
-solve_part1 = functools.partial(_simulate, n=20, relief=3)
-solve_part2 = functools.partial(_simulate, n=10000, relief=1)
+class CompiledMonkey(NamedTuple):
+    opcode: str     # 'add', 'mul' or 'square'
+    operand: int
+    divisor: int
+    true_monkey: int
+    false_monkey: int
+
+
+def _compile(monkey: Monkey) -> CompiledMonkey:
+    """Return the monkey's operation as an opcode and its argument parsed once."""
+    if monkey.arg == 'old':
+        opcode, operand = ('square', 0) if monkey.operator is operator.mul else ('mul', 2)
+    else:
+        opcode, operand = ('mul' if monkey.operator is operator.mul else 'add'), int(monkey.arg)
+    return CompiledMonkey(opcode, operand, monkey.divisor, monkey.true_monkey, monkey.false_monkey)
+
+
+def _apply(monkey: CompiledMonkey, item: T) -> T:
+    """Apply the monkey's operation to `item`, an integer or a NumPy array of integers."""
+    match monkey.opcode:
+        case 'add':
+            return item + monkey.operand
+        case 'mul':
+            return item * monkey.operand
+        case 'square':
+            return item * item
+
+
+def _monkey_business(inspected: Iterable[int]) -> int:
+    return math.prod(sorted(inspected, reverse=True)[:2])
+
+
+def _simulate_batches(monkeys: list[Monkey], n: int, relief: int = 1) -> int:
+    """
+    Like _simulate() but each monkey inspects all the items it holds in one go as a NumPy array.
+    Worry levels stay below mod_all, so mod_all squared must fit in an int64.
+    """
+    compiled = [_compile(monkey) for monkey in monkeys]
+    mod_all: int = math.prod(monkey.divisor for monkey in monkeys)
+    if mod_all ** 2 >= 2 ** 63:
+        raise ValueError(f'Worry levels modulo {mod_all} can overflow int64')
+
+    holding: list[list['np.ndarray']] = [[np.array(monkey.holding, dtype=np.int64)] for monkey in monkeys]
+    inspected = [0] * len(monkeys)
+    for _ in range(n):
+        for i, monkey in enumerate(compiled):
+            items = np.concatenate(holding[i])
+            holding[i] = []
+            inspected[i] += len(items)
+            new_items = (_apply(monkey, items) % mod_all) // relief
+            divisible = new_items % monkey.divisor == 0
+            holding[monkey.true_monkey].append(new_items[divisible])
+            holding[monkey.false_monkey].append(new_items[~divisible])
+    return _monkey_business(inspected)
+
+
+def _simulate_periodic(monkeys: list[Monkey], n: int, relief: int = 1) -> int:
+    """
+    Like _simulate() but follow each item through the rounds until its state at the start of a round,
+    (worry level, holder), repeats. The inspections for the rounds after that are whole cycles plus a remainder.
+    """
+    compiled = [_compile(monkey) for monkey in monkeys]
+    mod_all: int = math.prod(monkey.divisor for monkey in monkeys)
+    inspected = [0] * len(monkeys)
+
+    def play_round(item: int, holder: int) -> tuple[int, int, list[int]]:
+        """Return the item's state at the end of the round and the monkeys that inspected it."""
+        inspectors = []
+        while True:
+            monkey = compiled[holder]
+            inspectors.append(holder)
+            item = (_apply(monkey, item) % mod_all) // relief
+            throw_to = monkey.true_monkey if item % monkey.divisor == 0 else monkey.false_monkey
+            if throw_to < holder:   # the next monkey has had its turn already
+                return item, throw_to, inspectors
+            holder = throw_to
+
+    for holder, monkey in enumerate(monkeys):
+        for item in monkey.holding:
+            seen: dict[tuple[int, int], int] = {}
+            history: list[list[int]] = []
+            state = (item, holder)
+            while state not in seen and len(history) < n:
+                seen[state] = len(history)
+                item_now, holder_now, inspectors = play_round(*state)
+                state = (item_now, holder_now)
+                history.append(inspectors)
+            start = seen.get(state, len(history))
+            n_cycles, remainder = divmod(n - start, len(history) - start) if start < len(history) else (0, 0)
+            for r, inspectors in enumerate(history):
+                repeats = 1 if r < start else n_cycles + (r - start < remainder)
+                for inspector in inspectors:
+                    inspected[inspector] += repeats
+    return _monkey_business(inspected)
+
+
+solve_part1 = functools.partial(_simulate_periodic, n=20, relief=3)
+solve_part2 = functools.partial(_simulate_periodic, n=10000, relief=1)
 
 
 if __name__ == '__main__':
     title = 'Day 11: Monkey in the Middle'
     print(title.center(50, '-'))
 
+    # test that the compiled simulations agree with _simulate()
+    test = parse('day11_test.txt')
+    assert [_compile(monkey).opcode for monkey in test] == ['mul', 'add', 'square', 'add']
+    for rounds, relief in ((1, 3), (20, 3), (1, 1), (20, 1), (1000, 1), (10000, 1)):
+        expected = _simulate(test, rounds, relief)
+        assert _simulate_periodic(test, rounds, relief) == expected
+        assert _simulate_batches(test, rounds, relief) == expected
+    assert _simulate_periodic(test, 10 ** 7) > _simulate_periodic(test, 10 ** 4) == 2713310158
+
     for path in sys.argv[1:]:
         data = parse(path)
         part1 = solve_part1(data)
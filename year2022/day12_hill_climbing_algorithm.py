@@ -5,6 +5,10 @@ Usage example:
     Advent_Of_Code/year2022 $ python day12_hill_climbing_algorithm.py day12_test.txt day12_input.txt
 
 Inspired by Peter Norvig's solution for a faster part 2, but implemented with BFS instead of A*
+
+`DistanceField` runs a single reverse BFS from 'E' over a flat list of heights and keeps the distance of every cell to 'E',
+so the shortest path from 'S', from any 'a', or from any other cell is a lookup.
+The field is cached per grid, and `DistanceField.path()` rebuilds a path from the stored next-step indexes.
 """
 import sys
 from typing import *
@@ -136,7 +140,7 @@ def breadth_first_search(problem: HillClimbProblem, goal_test: Callable[T, bool]
     """
     initial_node: Node = Node(problem.start, parent=None)
     frontier: collections.deque[Node] = collections.deque([initial_node])
-    explored: set[T] = set(problem.start)
+    explored: set[T] = {problem.start}
 
     while frontier:
         current_node = frontier.popleft()   # pop from left for BFS, pop from right for DFS
@@ -187,16 +191,126 @@ def _find_path(puzzle_input: list[list[T]], problem_maker: Callable, *args) -> i
     return len(start_to_goal)
 
 
-solve_part1 = functools.partial(_find_path, problem_maker=HillClimbProblem)
-solve_part2 = functools.partial(
+bfs_part1 = functools.partial(_find_path, problem_maker=HillClimbProblem)
+bfs_part2 = functools.partial(
     _find_path,
     problem_maker=functools.partial(HillClimbProblem2, start=DUMMY_OFF_GRID)
 )
 
+
+class DistanceField:
+    """
+    Distances of every cell to 'E', where cell i of the flat grid is (i // width, i % width).
+    A cell that cannot reach 'E' has distance None.
+    """
+
+    def __init__(self, heights: Sequence[Sequence[int]]) -> None:
+        self.width = len(heights[0])
+        self.cells: list[int] = [value for row in heights for value in row]
+        self.start: int = self.cells.index(ALPHABETS.index('S'))
+        self.goal: int = self.cells.index(ALPHABETS.index('E'))
+        # 'S' has the height of 'a' and 'E' has the height of 'z'
+        self.heights: list[int] = [min(max(value, 1), len(ALPHABETS) - 2) for value in self.cells]
+        self.distances: list[Optional[int]] = [None] * len(self.cells)
+        self.next_step: list[Optional[int]] = [None] * len(self.cells)
+        self._reverse_bfs()
+
+    def __repr__(self) -> str:
+        return f'DistanceField(rows={len(self.cells) // self.width}, columns={self.width})'
+
+    def index(self, coord: Coord) -> int:
+        return coord[ROW] * self.width + coord[COLUMN]
+
+    def coord(self, i: int) -> Coord:
+        return divmod(i, self.width)
+
+    def neighbors(self, i: int) -> Iterator[int]:
+        row, column = divmod(i, self.width)
+        if row > 0:
+            yield i - self.width
+        if i + self.width < len(self.cells):
+            yield i + self.width
+        if column > 0:
+            yield i - 1
+        if column < self.width - 1:
+            yield i + 1
+
+    def _reverse_bfs(self) -> None:
+        """Walk downhill from 'E', i.e. to the neighbors that can climb up to the current cell."""
+        heights, distances, next_step = self.heights, self.distances, self.next_step
+        distances[self.goal] = 0
+        frontier: collections.deque[int] = collections.deque([self.goal])
+        while frontier:
+            current = frontier.popleft()
+            for neighbor in self.neighbors(current):
+                if distances[neighbor] is None and heights[current] - heights[neighbor] <= 1:
+                    distances[neighbor] = distances[current] + 1
+                    next_step[neighbor] = current
+                    frontier.append(neighbor)
+
+    def distance(self, coord: Coord) -> Optional[int]:
+        """Return the number of steps of the shortest path from `coord` to 'E'."""
+        return self.distances[self.index(coord)]
+
+    def shortest_from(self, char: str) -> Optional[int]:
+        """Return the number of steps of the shortest path to 'E' from any cell marked `char`."""
+        value = ALPHABETS.index(char)
+        return min(
+            (d for cell, d in zip(self.cells, self.distances) if cell == value and d is not None),
+            default=None
+        )
+
+    def path(self, coord: Coord) -> list[Coord]:
+        """Return the cells of the shortest path from `coord` to 'E', both ends included."""
+        i: Optional[int] = self.index(coord)
+        if self.distances[i] is None:
+            return []
+        path = []
+        while i is not None:
+            path.append(self.coord(i))
+            i = self.next_step[i]
+        return path
+
+
+@functools.cache
+def distance_field(heights: tuple[tuple[int, ...], ...]) -> DistanceField:
+    return DistanceField(heights)
+
+
+def solve_part1(puzzle_input: list[list[int]]) -> Optional[int]:
+    field = distance_field(tuple(map(tuple, puzzle_input)))
+    return field.distances[field.start]
+
+
+def solve_part2(puzzle_input: list[list[int]]) -> Optional[int]:
+    field = distance_field(tuple(map(tuple, puzzle_input)))
+    return min(
+        (d for d in (field.distances[field.start], field.shortest_from('a')) if d is not None),
+        default=None
+    )
+
 if __name__ == '__main__':
     title = 'Day 12: Hill Climbing Algorithm'
     print(title.center(50, '-'))
 
+    # test that DistanceField agrees with breadth_first_search()
+    test = parse('day12_test.txt')
+    testField = distance_field(tuple(map(tuple, test)))
+    assert distance_field(tuple(map(tuple, test))) is testField
+    assert solve_part1(test) == bfs_part1(test) == 31
+    assert solve_part2(test) == bfs_part2(test) == 29
+    assert testField.distance((0, 0)) == 31 and testField.distance((2, 5)) == 0
+    testPath = testField.path((0, 0))
+    assert testPath[0] == (0, 0) and testPath[-1] == (2, 5) and len(testPath) == 31 + 1
+    assert all(
+        abs(r1 - r2) + abs(c1 - c2) == 1 and test[r2][c2] - test[r1][c1] <= 1
+        for (r1, c1), (r2, c2) in itertools.pairwise(testPath[1:-1])
+    )
+
+    # 'S' is walled in by 'z', but an 'a' still reaches 'E'
+    walled = [[ALPHABETS.index(char) for char in 'Sz' + string.ascii_lowercase + 'E']]
+    assert solve_part1(walled) is None and solve_part2(walled) == 26
+
     for path in sys.argv[1:]:
         data = parse(path)
         part1 = solve_part1(data)
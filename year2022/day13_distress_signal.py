@@ -5,8 +5,15 @@ Usage example
     Advent_Of_Code/year2022 $ python day13_distress_signal.py day13_test.txt day13_input.txt
 
 Inspired by Peter Norvig for the elegant comparison and sorting
+
+For large packet files, the packets are instead turned into flat tuples of integers that compare natively.
+Because an integer compares exactly like a list holding only that integer, every integer can be wrapped in lists
+until all integers sit at the same depth. After that, an integer is only ever compared with an integer,
+and a packet compares like its stream of tokens (OPEN, CLOSE, and the integers) with CLOSE sorting first.
+`read_pairs()` tokenizes the file line by line without json.
 """
 import sys
+import re
 import json
 import pathlib
 import math
@@ -15,6 +22,11 @@ import itertools
 from typing import *
 
 Packet = list
+Tokens = list[int]
+
+OPEN, CLOSE = -1, -2     # packets only hold non-negative integers, so the sentinels sort below all of them
+DIVIDERS = '[[2]]', '[[6]]'
+TOKEN_PATTERN = re.compile(r'\[|\]|\d+')
 
 
 def parse(txt_filename: str) -> list[tuple[Any, ...]]:
@@ -52,7 +64,94 @@ def _right_order(packets: tuple[Packet, Packet]) -> bool:
     return _compare(*packets) <= 0
 
 
-def solve_part1(puzzle_input: list[tuple[Packet, Packet]]) -> int:
+def tokenize(line: str) -> Tokens:
+    """Return the packet written on `line` as a list of OPEN, CLOSE and integer tokens."""
+    return [
+        OPEN if token == '[' else CLOSE if token == ']' else int(token)
+        for token in TOKEN_PATTERN.findall(line)
+    ]
+
+
+def read_pairs(txt_filename: str) -> Iterator[tuple[Tokens, Tokens]]:
+    """Yield the pairs of packets in the file as tokens while reading it line by line."""
+    with open(txt_filename) as file:
+        packets = (tokenize(line) for line in file if line.strip())
+        yield from zip(packets, packets)
+
+
+def depth(tokens: Tokens) -> int:
+    """Return the most lists around an integer in `tokens`, counting an empty list as if it held an integer."""
+    deepest = level = 0
+    for previous, token in zip([None] + tokens, tokens):
+        if token == OPEN:
+            level += 1
+        elif token == CLOSE:
+            if previous == OPEN:
+                deepest = max(deepest, level)
+            level -= 1
+        else:
+            deepest = max(deepest, level)
+    return deepest
+
+
+def packet_key(tokens: Tokens, max_depth: int) -> tuple[int, ...]:
+    """
+    Return `tokens` with every integer wrapped in lists until it is inside `max_depth` lists, at least depth(tokens).
+    Keys made with the same `max_depth` compare like the packets.
+    """
+    key, level = [], 0
+    for token in tokens:
+        if token == OPEN:
+            level += 1
+            key.append(token)
+        elif token == CLOSE:
+            level -= 1
+            key.append(token)
+        else:
+            wraps = max_depth - level
+            key.extend((OPEN,) * wraps)
+            key.append(token)
+            key.extend((CLOSE,) * wraps)
+    return tuple(key)
+
+
+def in_right_order(left: Tokens, right: Tokens) -> bool:
+    max_depth = max(depth(left), depth(right))
+    return packet_key(left, max_depth) <= packet_key(right, max_depth)
+
+
+def sort_packets(packets: Iterable[Tokens]) -> list[Tokens]:
+    """Sort the packets with native tuple comparisons on keys of a common depth."""
+    packets = list(packets)
+    max_depth = max(map(depth, packets), default=0)
+    return sorted(packets, key=lambda tokens: packet_key(tokens, max_depth))
+
+
+def solve_part1(puzzle_input: Iterable[tuple[Tokens, Tokens]]) -> int:
+    """
+    Given pairs of packets as tokens, sum the indices of pairs whose items are in the right order.
+    """
+    return sum(
+        i
+        for i, pair in enumerate(puzzle_input, 1)
+        if in_right_order(*pair)
+    )
+
+
+def solve_part2(puzzle_input: Iterable[tuple[Tokens, Tokens]]) -> int:
+    """
+    Return the product of the indices the divider packets would have in the sorted packets.
+    A divider's index is one more than the number of packets, including the other divider, ordered before it.
+    """
+    dividers = [tokenize(divider) for divider in DIVIDERS]
+    below = [1 + i for i in range(len(dividers))]
+    for packet in itertools.chain.from_iterable(puzzle_input):
+        for i, divider in enumerate(dividers):
+            below[i] += in_right_order(packet, divider)
+    return math.prod(below)
+
+
+def _solve_part1_recursive(puzzle_input: list[tuple[Packet, Packet]]) -> int:
     """
     Given a list of pair of packets, sum the indices of pairs
     whose items are in the right order.
@@ -64,7 +163,7 @@ def solve_part1(puzzle_input: list[tuple[Packet, Packet]]) -> int:
     )
 
 
-def solve_part2(puzzle_input: list[tuple[Packet]]) -> int:
+def _solve_part2_recursive(puzzle_input: list[tuple[Packet]]) -> int:
     """
     Unpair the packets and sort them according to the comparison rule.
     Insert the divider packets ([[2]] and [[6]]) in their appropriate place. Return the product of the indices of the divider packets in the sorted sequence.
@@ -81,10 +180,24 @@ if __name__ == '__main__':
     title = 'Day 13: Distress Signal'
     print(title.center(50, '-'))
 
+    # test that the packet keys order the packets like _compare()
+    test = parse('day13_test.txt')
+    testPackets = [json.dumps(packet) for packet in itertools.chain.from_iterable(test)] + list(DIVIDERS)
+    for left, right in itertools.product(testPackets, repeat=2):
+        expected = _compare(json.loads(left), json.loads(right))
+        max_depth = max(depth(tokenize(left)), depth(tokenize(right)))
+        keys = packet_key(tokenize(left), max_depth), packet_key(tokenize(right), max_depth)
+        assert (keys[0] > keys[1]) - (keys[0] < keys[1]) == (expected > 0) - (expected < 0)
+    assert depth(tokenize('[[1],4]')) == 2 and depth(tokenize('[[[]]]')) == 3 and depth(tokenize('[]')) == 1
+    assert packet_key(tokenize('[[1],4]'), 2) == (OPEN, OPEN, 1, CLOSE, OPEN, 4, CLOSE, CLOSE)
+    assert packet_key(tokenize('[[]]'), 3) == (OPEN, OPEN, CLOSE, CLOSE)
+    assert sort_packets(map(tokenize, testPackets))[0] == tokenize('[]')
+    assert solve_part1(read_pairs('day13_test.txt')) == _solve_part1_recursive(test) == 13
+    assert solve_part2(read_pairs('day13_test.txt')) == _solve_part2_recursive(test) == 140
+
     for path in sys.argv[1:]:
-        data = parse(path)
-        part1 = solve_part1(data)
-        part2 = solve_part2(data)
+        part1 = solve_part1(read_pairs(path))
+        part2 = solve_part2(read_pairs(path))
         print(f"""{path}:
         Part 1: The sum of the indices of packets that are paired in the right order is {part1}.
         Part 2: The product of the indices of divider packets is {part2}.
@@ -10,6 +10,11 @@ However, the y is inverted axis where y increases as you go "down" instead of "u
 
 Inspired by Peter Norvig's solution to only add grid coordinate to the Grid dictionary
 if the cell value is either a rock ('#') or a sand particle that has come to rest ('o').
+
+`Cave` is a faster alternative that keeps rocks and sand in a dense bytearray sized from the rock paths.
+`Cave.pour()` keeps the path of the falling grain on a stack, so the next grain starts from where the previous one
+was just before it came to rest instead of from the Source. With a floor, every cell the sand can reach fills up,
+so `Cave.flood()` counts them row by row without dropping any grain.
 """
 import sys
 from typing import *
@@ -102,27 +107,96 @@ def _simulate(grid: Grid, lay_floor: bool = False):
             loc = new_loc
 
 
+class Cave:
+    """
+    Rocks and sand in a bytearray where cell (x, y) is at `(y * self.width) + (x - self.x0)`.
+    The cave is wide enough for the sand pile to spread over a floor 2 below the lowest rock.
+    """
+
+    def __init__(self, paths: list[RockPath]) -> None:
+        self.bottom: int = max(y for path in paths for _, y in path)
+        self.floor: int = self.bottom + 2
+        self.x0: int = min(Source[X] - self.floor, min(x for path in paths for x, _ in path)) - 1
+        self.width: int = max(Source[X] + self.floor, max(x for path in paths for x, _ in path)) + 2 - self.x0
+        self.cells = bytearray(self.width * (self.floor + 1))
+        self.rock_rows: list[int] = [0] * (self.floor + 1)     # bit x - x0 of row y is set if (x, y) is a rock
+        for path_of_rocks in paths:
+            for (x0, y0), (x1, y1) in itertools.pairwise(path_of_rocks):
+                for x, y in itertools.product(range(min(x0, x1), max(x0, x1) + 1), range(min(y0, y1), max(y0, y1) + 1)):
+                    self.cells[self.index((x, y))] = 1
+                    self.rock_rows[y] |= 1 << (x - self.x0)
+
+    def __repr__(self) -> str:
+        return f'Cave(x0={self.x0}, width={self.width}, floor={self.floor})'
+
+    def index(self, coord: Coord) -> int:
+        return coord[Y] * self.width + coord[X] - self.x0
+
+    def pour(self, lay_floor: bool = False) -> int:
+        """
+        Pour sand from Source and return how many grains come to rest before one falls below the lowest rock,
+        or, with `lay_floor`, until a grain comes to rest at the Source.
+        """
+        cells, width = self.cells.copy(), self.width
+        if lay_floor:
+            start = self.floor * width
+            cells[start: start + width] = b'\x01' * width
+        # each step down adds width - 1, width or width + 1 to the index
+        moves = width, width - 1, width + 1
+        below_bottom = (self.bottom + 1) * width
+        path = [self.index(Source)]
+        count = 0
+        while path:
+            i = path[-1]
+            if not lay_floor and i >= below_bottom:
+                return count
+            for move in moves:
+                if not cells[i + move]:
+                    path.append(i + move)
+                    break
+            else:
+                cells[i] = 1
+                path.pop()
+                count += 1
+        return count
+
+    def flood(self) -> int:
+        """Return how many grains come to rest with a floor, counting the cells that sand can reach row by row."""
+        row = 1 << (Source[X] - self.x0)
+        count = 0
+        for y in range(self.floor):
+            row &= ~self.rock_rows[y]
+            count += row.bit_count()
+            row |= row << 1 | row >> 1
+        return count
+
+
 def solve_part1(puzzle_input: list[RockPath]) -> int:
     """
-    Place the rocks on the paths by feeding the puzzle_input into _place_rocks().
-    Simulate the sand falling by running _simulate() on default args.
+    Place the rocks on the paths in a Cave and pour sand until a grain falls into the abyss.
+    _simulate() on a Grid made by _place_rocks() gives the same answer more slowly.
     """
-    grid = _place_rocks(Grid(directions=DIRECTIONS), puzzle_input)
-    return _simulate(grid)
+    return Cave(puzzle_input).pour()
 
 
 def solve_part2(puzzle_input: list[RockPath]) -> int:
     """
-    The same as part 1, but run _simulate() with the argument lay_floor set to False.
+    The same as part 1, but with a floor, so the sand fills every cell it can reach.
     """
-    grid = _place_rocks(Grid(directions=DIRECTIONS), puzzle_input)
-    return _simulate(grid, lay_floor=True)
+    return Cave(puzzle_input).flood()
 
 
 if __name__ == '__main__':
     title = 'Day 14: Regolith Reservoir'
     print(title.center(50, '-'))
 
+    # test that Cave agrees with _simulate()
+    test = parse('day14_test.txt')
+    testCave = Cave(test)
+    assert testCave.pour() == _simulate(_place_rocks(Grid(directions=DIRECTIONS), test)) == 24
+    assert testCave.pour(lay_floor=True) == testCave.flood() == \
+        _simulate(_place_rocks(Grid(directions=DIRECTIONS), test), lay_floor=True) == 93
+
     for path in sys.argv[1:]:
         data = parse(path)
         part1 = solve_part1(data)
@@ -24,6 +24,12 @@ The above solution to part 2 takes longer than this solution, which involves mor
     A2. Filter out edges that are not shared by at least 2 sensors.
     A3. Find the intersection point for every pair of edges.
     A4. Filter out intersection points whose x or y coordinate is outside [0, 4_000_000] or is detectable by some sensor.
+
+CoverageIndex answers both parts without walking individual points.
+Part 1 sorts and merges the x intervals each sensor covers on a row, so the covered length is the sum of the merged lengths.
+Part 2 intersects the diagonal lines x + y = a and x - y = b running 1 unit outside each sensor's range,
+together with the borders of the search area, and keeps the intersection that no sensor covers.
+Both queries can be batched over many rows and many search areas.
 """
 import sys
 import pathlib
@@ -136,18 +142,105 @@ def _find_distress_beacon(sb_pairs: list[SensorBeacon], max_value: int = 20):
     return target_beacon[X] * 4_000_000 + target_beacon[Y]
 
 
+class CoverageIndex:
+    """The sensor ranges of a list of SensorBeacon as (x, y, radius) triples."""
+
+    def __init__(self, pairs: list[SensorBeacon]) -> None:
+        self.sensors: list[tuple[int, int, int]] = [
+            (sensor[X], sensor[Y], _manhattan_distance(sensor, beacon)) for sensor, beacon in pairs
+        ]
+        self.beacons: set[Coord] = {beacon for _, beacon in pairs}
+
+    def __repr__(self) -> str:
+        return f'CoverageIndex(sensors={len(self.sensors)})'
+
+    def intervals(self, yline: int) -> list[tuple[int, int]]:
+        """Return the sorted, disjoint [x_left, x_right] intervals covered by some sensor on y = yline."""
+        spans = sorted(
+            (x - (radius - abs(yline - y)), x + (radius - abs(yline - y)))
+            for x, y, radius in self.sensors
+            if abs(yline - y) <= radius
+        )
+        merged: list[tuple[int, int]] = []
+        for left, right in spans:
+            if merged and left <= merged[-1][1] + 1:
+                merged[-1] = merged[-1][0], max(merged[-1][1], right)
+            else:
+                merged.append((left, right))
+        return merged
+
+    def covered_length(self, yline: int) -> int:
+        """Return the number of positions on y = yline within range of some sensor."""
+        return sum(right - left + 1 for left, right in self.intervals(yline))
+
+    def count_empty(self, yline: int) -> int:
+        """Return the number of positions on y = yline that cannot have a beacon."""
+        return self.covered_length(yline) - sum(1 for beacon in self.beacons if beacon[Y] == yline)
+
+    def count_empty_many(self, ylines: Iterable[int]) -> list[int]:
+        return [self.count_empty(yline) for yline in ylines]
+
+    def is_covered(self, point: Coord) -> bool:
+        return any(abs(point[X] - x) + abs(point[Y] - y) <= radius for x, y, radius in self.sensors)
+
+    def find_uncovered(self, low: int = 0, high: int = 20) -> Optional[Coord]:
+        """
+        Return a point with both coordinates in [low, high] that no sensor covers, or None.
+        If there is exactly one such point, it lies on a corner where the diagonal lines just outside
+        the sensor ranges, or the borders of the search area, cross.
+        """
+        sums = {x + y + d for x, y, radius in self.sensors for d in (-radius - 1, radius + 1)}
+        diffs = {x - y + d for x, y, radius in self.sensors for d in (-radius - 1, radius + 1)}
+        candidates = {
+            ((a + b) // 2, (a - b) // 2) for a in sums for b in diffs if (a + b) % 2 == 0
+        }
+        for border in (low, high):
+            candidates.update(point for a in sums for point in ((border, a - border), (a - border, border)))
+            candidates.update(point for b in diffs for point in ((border, border - b), (b + border, border)))
+            candidates.update({(low, border), (high, border)})
+        return next(
+            (
+                point for point in sorted(candidates)
+                if low <= point[X] <= high and low <= point[Y] <= high and not self.is_covered(point)
+            ),
+            None
+        )
+
+    def find_uncovered_many(self, bounds: Iterable[tuple[int, int]]) -> list[Optional[Coord]]:
+        return [self.find_uncovered(low, high) for low, high in bounds]
+
+
+def count_empty_coords(pairs: list[SensorBeacon], yline: int = 10) -> int:
+    """(Part 1) Like _count_empty_coords() but with merged intervals."""
+    return CoverageIndex(pairs).count_empty(yline)
+
+
+def find_distress_signal(pairs: list[SensorBeacon], max_value: int = 20) -> int:
+    """(Part 2) Like _find_distress_beacon() but with intersections of the sensor boundaries."""
+    x, y = CoverageIndex(pairs).find_uncovered(0, max_value)
+    return x * 4_000_000 + y
+
+
 if __name__ == '__main__':
     title = 'Day 15: Beacon Exclusion Zone'
     print(title.center(50, '-'))
 
+    # test that CoverageIndex agrees with the point-by-point functions
+    test = parse('day15_test.txt')
+    testIndex = CoverageIndex(test)
+    assert testIndex.count_empty_many(range(-5, 30)) == [_count_empty_coords(test, y) for y in range(-5, 30)]
+    assert count_empty_coords(test) == _count_empty_coords(test) == 26
+    assert find_distress_signal(test) == _find_distress_beacon(test) == 56000011
+    assert testIndex.find_uncovered_many([(0, 20), (0, 10), (14, 14)]) == [(14, 11), None, None]
+
     for file in sys.argv[1:]:
         data = parse(file)
         if 'test' in file:
-            solve_part1 = _count_empty_coords
-            solve_part2 = _find_distress_beacon
+            solve_part1 = count_empty_coords
+            solve_part2 = find_distress_signal
         else:
-            solve_part1 = functools.partial(_count_empty_coords, yline=2_000_000)
-            solve_part2 = functools.partial(_find_distress_beacon, max_value=4_000_000)
+            solve_part1 = functools.partial(count_empty_coords, yline=2_000_000)
+            solve_part2 = functools.partial(find_distress_signal, max_value=4_000_000)
         part1 = solve_part1(data)
         part2 = solve_part2(data)
         print(f"""{file}:
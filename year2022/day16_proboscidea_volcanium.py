@@ -21,6 +21,10 @@ _depth_first_search() uses integers to represent which set of valves are open.
     - Valve i is open if p & 2^i equals 1 and closed otherwise.
     - Valve i is added to p by taking the union, p | 2^i.
 
+max_pressure() is a faster alternative that interns the valve names to integers,
+runs Floyd-Warshall on a dense matrix, and keeps the best pressure per set of opened valves in a list indexed by the set.
+A subset-maximum transform over that list turns "the best with exactly these valves" into "the best within these valves",
+so splitting the valves among N agents with their own minute budgets no longer needs a double loop over all sets.
 """
 import sys
 import pathlib
@@ -28,6 +32,7 @@ import re
 import math
 import collections
 import itertools
+from typing import *
 
 Valve = collections.namedtuple('Valve', ['name', 'flow_rate', 'connections'])
 Nodes = dict[str, tuple[int, int]]
@@ -112,37 +117,138 @@ def _depth_first_search(costs: Edges, valves_to_open: Nodes, minutes: int = 30):
     return explored
 
 
+def _dense_floyd_warshall(valves: list[Valve]) -> tuple[dict[str, int], list[list[float]]]:
+    """
+    Intern the valve names to the integers 0, 1, 2, ... in the order of `valves`
+    and return the interned names and the matrix of shortest distances between them.
+    """
+    index: dict[str, int] = {valve.name: i for i, valve in enumerate(valves)}
+    n = len(valves)
+    dist: list[list[float]] = [[0 if i == j else math.inf for j in range(n)] for i in range(n)]
+    for valve in valves:
+        for name in valve.connections.split(', '):
+            dist[index[valve.name]][index[name]] = 1
+
+    for k in range(n):
+        dist_k = dist[k]
+        for i in range(n):
+            dist_i, d_ik = dist[i], dist[i][k]
+            if d_ik == math.inf:
+                continue
+            for j in range(n):
+                if d_ik + dist_k[j] < dist_i[j]:
+                    dist_i[j] = d_ik + dist_k[j]
+    return index, dist
+
+
+def _best_per_mask(dist: list[list[float]], flows: list[int], start: int, minutes: int) -> list[int]:
+    """
+    Return a list whose item at `mask` is the most pressure released by opening exactly the valves in `mask`
+    within `minutes`, where valve i is the ith valve of `flows` and `dist[-1]` holds the distances from `start`.
+    A state (valve, time left, mask) reached again with no more pressure is not explored again.
+    """
+    k = len(flows)
+    best: list[int] = [0] * (1 << k)
+    seen: dict[tuple[int, int, int], int] = {}
+
+    def visit(valve: int, time_left: int, mask: int, pressure: int) -> None:
+        if seen.get((valve, time_left, mask), -1) >= pressure:
+            return
+        seen[valve, time_left, mask] = pressure
+        if best[mask] < pressure:
+            best[mask] = pressure
+        for j in range(k):
+            if not mask & (1 << j):
+                t = time_left - dist[valve][j] - 1
+                if t > 0:
+                    visit(j, t, mask | (1 << j), pressure + flows[j] * t)
+
+    visit(start, minutes, 0, 0)
+    return best
+
+
+def _subset_max(table: list[int]) -> list[int]:
+    """Return a list whose item at `mask` is the largest item of `table` at any subset of `mask`."""
+    out = table.copy()
+    bit = 1
+    while bit < len(out):
+        for mask in range(len(out)):
+            if mask & bit and out[mask ^ bit] > out[mask]:
+                out[mask] = out[mask ^ bit]
+        bit <<= 1
+    return out
+
+
+def max_pressure(valves: list[Valve], budgets: Sequence[int] = (30,), start: str = 'AA') -> int:
+    """
+    Return the most pressure released by len(`budgets`) agents starting at `start`,
+    the ith of which has `budgets[i]` minutes to open valves that no other agent opens.
+    """
+    index, dist = _dense_floyd_warshall(valves)
+    useful: list[Valve] = [valve for valve in valves if int(valve.flow_rate) > 0]
+    flows: list[int] = [int(valve.flow_rate) for valve in useful]
+    rows = [index[valve.name] for valve in useful] + [index[start]]
+    dense = [[dist[i][j] for j in rows[:-1]] for i in rows]    # the last row holds the distances from `start`
+
+    tables = {minutes: _best_per_mask(dense, flows, len(flows), minutes) for minutes in set(budgets)}
+    full = (1 << len(flows)) - 1
+
+    *others, last = budgets
+    within: list[int] = _subset_max(tables[others[0]]) if others else [0] * (full + 1)
+    for minutes in others[1:]:
+        # within[mask] becomes the best of the agents so far using only the valves in `mask`
+        best, combined = tables[minutes], within.copy()
+        for opened, pressure in enumerate(best):
+            if pressure == 0:
+                continue
+            rest = full ^ opened
+            subset = rest
+            while True:
+                if pressure + within[subset] > combined[opened | subset]:
+                    combined[opened | subset] = pressure + within[subset]
+                if subset == 0:
+                    break
+                subset = (subset - 1) & rest
+        within = combined
+    return max(pressure + within[full ^ opened] for opened, pressure in enumerate(tables[last]))
+
+
 def solve_part1(puzzle_input: list[Valve]) -> int:
     """
-    Set up the arguments by passing the puzzle input to _get_costs_and_flows().
-    Find the valves to open that would maximize the pressure released via _depth_first_search().
-    Return the maximum pressure released by the possible states of visits.
+    Return the maximum pressure released in 30 minutes.
+    _depth_first_search() on the output of _get_costs_and_flows() gives the same answer more slowly.
     """
-    args = _get_costs_and_flows(puzzle_input)
-    visits = _depth_first_search(*args)
-    return max(visits.values())
+    return max_pressure(puzzle_input, budgets=(30,))
 
 
 def solve_part2(puzzle_input: list[Valve]) -> int:
     """
-    Like part 1, but explore the valves to open via _depth_first_search(minutes=26) because the first 4 minutes
+    Like part 1, but with two agents, the elephant and me, who have 26 minutes each because the first 4 minutes
     are consumed to teach the elephant and no valves can be opened during that time.
     Return the maximum pressure released.
     """
-    args = _get_costs_and_flows(puzzle_input)
-    visits = _depth_first_search(*args, minutes=26)
-    return max(
-        elephant_work + my_work
-        for elephant, elephant_work in visits.items()
-        for me, my_work in visits.items()
-        if not me & elephant
-    )
+    return max_pressure(puzzle_input, budgets=(26, 26))
 
 
 if __name__ == '__main__':
     title = 'Day 16: Proboscidea Volcanium'
     print(title.center(50, '-'))
 
+    # test that max_pressure() agrees with _depth_first_search()
+    test = parse('day16_test.txt')
+    testArgs = _get_costs_and_flows(test)
+    testVisits = _depth_first_search(*testArgs, minutes=26)
+    assert max_pressure(test) == max(_depth_first_search(*testArgs).values()) == 1651
+    assert max_pressure(test, budgets=(26, 26)) == max(
+        elephant_work + my_work
+        for elephant, elephant_work in testVisits.items()
+        for me, my_work in testVisits.items()
+        if not me & elephant
+    ) == 1707
+    assert max_pressure(test, budgets=(26,)) == max(testVisits.values())
+    assert max_pressure(test, budgets=(26, 26, 26)) >= 1707
+    assert max_pressure(test, budgets=(0, 30)) == max_pressure(test, budgets=(30, 0)) == 1651
+
     for path in sys.argv[1:]:
 
         data = parse(path)
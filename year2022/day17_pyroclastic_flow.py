@@ -19,6 +19,11 @@ The cycle will be determined while simulating the tetris process. During the sim
     - the jet index (0, 1, ..., J);
     - the leftmost row index where the indexed rock that has stopped moving (0, 1, 2, ..., 6);
     - the height of the tower.
+
+`BitTower` is a compact alternative to `Tower` that stores each row of the chamber as a 7-bit integer in a bytearray
+and moves rocks as shifted bitmasks. `tower_height()` drops rocks into a BitTower and detects a cycle
+as soon as a (rock index, jet index, skyline of the top rows) key repeats, which makes it fast enough for
+tens of millions of rocks or jet patterns of 100k+ characters.
 """
 import sys
 import pathlib
@@ -179,6 +184,93 @@ def _determine_period(jets: str, max_rocks: int = 2022) -> PeriodicSequence | No
     return
 
 
+def _rock_rows(rock: Rock) -> tuple[int, ...]:
+    """
+    Return the rows of `rock` from the bottom up as bitmasks of the chamber width, where x = 0 is the highest bit,
+    with the rock `X_OFFSET` units away from the left wall.
+    """
+    top = max(y for _, y in rock)
+    return tuple(
+        sum(1 << (CHAMBER_WIDTH - 1 - X_OFFSET - x) for x, y in rock if y == top - i)
+        for i in range(top + 1)
+    )
+
+
+ROCK_ROWS: list[tuple[int, ...]] = [_rock_rows(rock) for rock in ROCKS]
+LEFT_WALL, RIGHT_WALL = 1 << (CHAMBER_WIDTH - 1), 1
+
+
+class BitTower:
+    """A tower where `self.rows[y]` is the bitmask of the settled rocks in row y counted up from the floor."""
+
+    def __init__(self) -> None:
+        self.rows = bytearray()
+        self.height = 0
+
+    def __repr__(self) -> str:
+        return f'BitTower(height={self.height})'
+
+    def collides(self, rock: Sequence[int], y: int) -> bool:
+        if y >= self.height:
+            return False
+        rows = self.rows
+        return any(y + i < len(rows) and rows[y + i] & row for i, row in enumerate(rock))
+
+    def drop(self, rock: Sequence[int], jets: str, jet_idx: int) -> int:
+        """Drop `rock` until it settles, pushed by `jets` starting at `jet_idx`. Return the next jet index."""
+        y = self.height + Y_OFFSET - 1
+        while True:
+            if jets[jet_idx] == '<':
+                if not any(row & LEFT_WALL for row in rock):
+                    pushed = tuple(row << 1 for row in rock)
+                    rock = rock if self.collides(pushed, y) else pushed
+            elif not any(row & RIGHT_WALL for row in rock):
+                pushed = tuple(row >> 1 for row in rock)
+                rock = rock if self.collides(pushed, y) else pushed
+            jet_idx = (jet_idx + 1) % len(jets)
+            if y == 0 or self.collides(rock, y - 1):
+                break
+            y -= 1
+
+        if len(self.rows) < y + len(rock):
+            self.rows.extend(bytes(y + len(rock) - len(self.rows)))
+        for i, row in enumerate(rock):
+            self.rows[y + i] |= row
+        self.height = max(self.height, y + len(rock))
+        return jet_idx
+
+    def skyline(self, n_rows: int) -> bytes:
+        return bytes(self.rows[max(self.height - n_rows, 0): self.height])
+
+
+def tower_height(jets: str, n_rocks: int, skyline_rows: int = 64, detect_cycles: bool = True) -> int:
+    """
+    Return the height of the tower after `n_rocks` rocks have stopped falling.
+    With `detect_cycles`, skip ahead as soon as the rock index, the jet index and the top `skyline_rows` rows
+    repeat an earlier state.
+    """
+    jets = jets.strip()
+    tower = BitTower()
+    seen: dict[tuple[int, int, bytes], tuple[int, int]] = {}
+    jet_idx, skipped_height, n = 0, 0, 0
+    while n < n_rocks:
+        rock_idx = n % len(ROCK_ROWS)
+        if detect_cycles and tower.height >= skyline_rows:
+            state = (rock_idx, jet_idx, tower.skyline(skyline_rows))
+            if state in seen:
+                previous_n, previous_height = seen[state]
+                period, delta_height = n - previous_n, tower.height - previous_height
+                n_periods = (n_rocks - n) // period
+                n += n_periods * period
+                skipped_height = n_periods * delta_height
+                detect_cycles = False
+                continue
+            seen[state] = (n, tower.height)
+        jet_idx = tower.drop(ROCK_ROWS[rock_idx], jets, jet_idx)
+        n += 1
+    return tower.height + skipped_height
+
+
 def parse(txt_filename: str) -> str:
     """Return the content of the file as string."""
     return pathlib.Path(txt_filename).read_text()
@@ -189,13 +281,23 @@ def _solve(puzzle_input: str, n_rocks: int) -> int:
     return periodic_sequence.compute_final_height(n_rocks)
 
 
-solve_part1 = functools.partial(_solve, n_rocks=2022)
-solve_part2 = functools.partial(_solve, n_rocks=1_000_000_000_000)
+solve_part1 = functools.partial(tower_height, n_rocks=2022)
+solve_part2 = functools.partial(tower_height, n_rocks=1_000_000_000_000)
 
 if __name__ == '__main__':
     title = 'Day 17: Pyroclastic Flow'
     print(title.center(50, '-'))
 
+    # test that BitTower builds the same tower as Tower
+    test = parse('day17_test.txt')
+    assert ROCK_ROWS[0] == (0b0011110,) and ROCK_ROWS[2] == (0b0011100, 0b0000100, 0b0000100)
+    testTower, testJets = Tower(), itertools.cycle(enumerate(test))
+    testHeights = [_simulate(i, rock, testTower, testJets)[-1] for i, rock in zip(range(100), itertools.cycle(ROCKS))]
+    assert [tower_height(test, n, detect_cycles=False) for n in range(1, 101)] == testHeights
+    assert tower_height(test, 10) == 17
+    assert tower_height(test, 2022, detect_cycles=False) == tower_height(test, 2022) == _solve(test, 2022) == 3068
+    assert tower_height(test, 1_000_000_000_000) == 1514285714288
+
     for path in sys.argv[1:]:
         data = parse(path)
         part1 = solve_part1(data)
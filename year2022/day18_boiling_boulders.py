@@ -6,12 +6,25 @@ Usage example
 
 Inspired by Peter Norvig' solution for its parsimony
 (cf. https://www.reddit.com/r/adventofcode/comments/zoqhvy/comment/j1ry942/?utm_source=share&utm_medium=web2x&context=3).
+
+For large droplets, the droplet is loaded into a 3-D NumPy boolean array with one empty cell of padding on every side.
+A face is exposed wherever two neighboring cells along an axis differ, so the surface area is the number of
+XOR-ed pairs along the three axes. The exterior is filled in from the padding with scanline sweeps, each of which
+spreads it through whole runs of air along one axis, and the exterior surface area is the surface area of
+everything that is not exterior.
+
+Benchmark example
+    Advent_Of_Code/year2022 $ python -c 'import day18_boiling_boulders as day18; day18.benchmark()'
 """
 import sys
 import collections
 import pathlib
+import random
+import time
 from typing import *
 
+import numpy as np
+
 Voxel = collections.namedtuple('Voxel', ['x', 'y', 'z'])
 
 
@@ -83,6 +96,97 @@ def _count_exterior_surface_area(voxels: list[Voxel]):
     return area_count
 
 
+def _droplet_array(voxels: list[Voxel]) -> 'np.ndarray':
+    """Return the droplet as a boolean array with one empty cell of padding around the voxels."""
+    coords = np.array(voxels, dtype=np.int64).reshape(-1, 3)
+    coords -= coords.min(axis=0) - 1
+    droplet = np.zeros(coords.max(axis=0) + 2, dtype=bool)
+    droplet[tuple(coords.T)] = True
+    return droplet
+
+
+def _count_faces(solid: 'np.ndarray') -> int:
+    """Count the faces between a True cell and a False cell of `solid` along each of the three axes."""
+    return sum(int(np.count_nonzero(np.diff(solid, axis=axis))) for axis in range(3))
+
+
+def _sweep(exterior: 'np.ndarray', droplet: 'np.ndarray', axis: int) -> 'np.ndarray':
+    """
+    Spread `exterior` along `axis` in both directions through every run of air cells,
+    i.e. an air cell becomes exterior if an exterior cell comes before it along the axis with no droplet in between.
+    """
+    shape = [1, 1, 1]
+    shape[axis] = droplet.shape[axis]
+    index = np.arange(droplet.shape[axis]).reshape(shape)
+    spread = exterior.copy()
+    for flip in (False, True):
+        ext, wall = (np.flip(exterior, axis), np.flip(droplet, axis)) if flip else (exterior, droplet)
+        last_exterior = np.maximum.accumulate(np.where(ext, index, -1), axis=axis)
+        last_wall = np.maximum.accumulate(np.where(wall, index, -1), axis=axis)
+        reached = last_exterior > last_wall
+        spread |= np.flip(reached, axis) if flip else reached
+    return spread
+
+
+def _fill_exterior(droplet: 'np.ndarray') -> 'np.ndarray':
+    """
+    Return the cells that can be reached from the padding without crossing the droplet
+    by sweeping along the three axes in turn until the exterior stops growing.
+    """
+    exterior = np.zeros_like(droplet)
+    exterior[0, :, :] = True
+    while True:
+        grown = exterior
+        for axis in range(3):
+            grown = _sweep(grown, droplet, axis)
+        if np.array_equal(grown, exterior):
+            return exterior
+        exterior = grown
+
+
+def count_surface_area(voxels: list[Voxel]) -> int:
+    """Like _count_surface_area() but on a boolean array."""
+    return _count_faces(_droplet_array(voxels))
+
+
+def count_exterior_surface_area(voxels: list[Voxel]) -> int:
+    """Like _count_exterior_surface_area() but on a boolean array."""
+    return _count_faces(~_fill_exterior(_droplet_array(voxels)))
+
+
+def generate_droplet(n: int, seed: int = 18) -> list[Voxel]:
+    """Return a droplet of about `n` voxels as a random blob grown from the origin, which leaves air pockets."""
+    rng = random.Random(seed)
+    voxels, frontier = {Voxel(0, 0, 0)}, [Voxel(0, 0, 0)]
+    while len(voxels) < n:
+        voxel = frontier[rng.randrange(len(frontier))]
+        neighbor = Voxel(*(p + rng.choice((-1, 0, 1)) for p in voxel))
+        if neighbor not in voxels:
+            voxels.add(neighbor)
+            frontier.append(neighbor)
+    return list(voxels)
+
+
+def benchmark(sizes: Iterable[int] = (1_000, 10_000, 100_000, 1_000_000), list_max_size: int = 1_000) -> None:
+    """
+    Print the answers and the time the list-based and array-based functions take on generated droplets.
+    The list-based functions are skipped on droplets larger than `list_max_size` because they are quadratic.
+    """
+    pairs = (
+        ('list', _count_surface_area, _count_exterior_surface_area),
+        ('array', count_surface_area, count_exterior_surface_area)
+    )
+    for n in sizes:
+        droplet = generate_droplet(n)
+        for name, part1, part2 in pairs:
+            if name == 'list' and n > list_max_size:
+                print(f'{n:>9} {name:>5}: skipped')
+                continue
+            start = time.perf_counter()
+            answers = part1(droplet), part2(droplet)
+            print(f'{n:>9} {name:>5}: {answers} in {time.perf_counter() - start:.2f}s')
+
+
 def parse(txt_filename) -> list[Voxel]:
     """Return the file content as a list of Voxels."""
     return [
@@ -91,13 +195,22 @@ def parse(txt_filename) -> list[Voxel]:
     ]
 
 
-solve_part1 = _count_surface_area
-solve_part2 = _count_exterior_surface_area
+solve_part1 = count_surface_area
+solve_part2 = count_exterior_surface_area
 
 if __name__ == '__main__':
     title = 'Day 18: Boiling Boulders'
     print(title.center(50, '-'))
 
+    # test that the array-based functions agree with the list-based ones
+    test = parse('day18_test.txt')
+    assert count_surface_area(test) == _count_surface_area(test) == 64
+    assert count_exterior_surface_area(test) == _count_exterior_surface_area(test) == 58
+    assert count_surface_area([Voxel(1, 1, 1), Voxel(2, 1, 1)]) == 10
+    testDroplet = generate_droplet(500)
+    assert count_surface_area(testDroplet) == _count_surface_area(testDroplet)
+    assert count_exterior_surface_area(testDroplet) == _count_exterior_surface_area(testDroplet)
+
     for path in sys.argv[1:]:
 
         data = parse(path)
@@ -18,6 +18,11 @@ The three key ideas to solving the search problem are:
     - to prune search states that do not lead to the best known result.
 
 *: Though the solution uses depth-first search, there is some prioritization done by popping out the action that builds a geo robot so that this branch is searched first.
+
+max_geodes() is a faster branch-and-bound search that branches on which robot to build next and skips ahead
+to the minute it can be built. Its states are plain int tuples, and it prunes a branch with an upper bound
+that builds a clay robot every minute and obsidian and geode robots whenever there is enough clay and obsidian.
+solve_blueprints() spreads the blueprints across worker processes and reports the time and nodes for each.
 """
 import sys
 import re
@@ -25,6 +30,8 @@ import pathlib
 import functools
 import collections
 import math
+import time
+import concurrent.futures
 from typing import *
 
 Blueprint = collections.namedtuple(
@@ -36,6 +43,7 @@ Inventory = collections.namedtuple(
     ['time_left', 'ore', 'clay', 'obs', 'geo', 'ore_rbt', 'clay_rbt', 'obs_rbt', 'geo_rbt'],
     defaults=(0,)*9
 )
+SearchResult = collections.namedtuple('SearchResult', ['id', 'geodes', 'nodes', 'seconds'])
 
 
 def _update_inventory(state: Inventory, **kwargs) -> Inventory:
@@ -153,26 +161,119 @@ def _down_the_branch(state: Inventory, upper_limit: Inventory, blueprint: Bluepr
     return successors
 
 
+def _geode_bound(time_left: int, clay: int, obs: int, clay_rbt: int, obs_rbt: int, geodes: int,
+                 obs_rbt_clay: int, geo_rbt_obs: int) -> int:
+    """
+    Return an upper bound on the geodes a branch can crack, pretending that ore is free
+    and that a clay robot, an obsidian robot and a geode robot can all be built in the same minute.
+    """
+    for minute in range(time_left, 0, -1):
+        build_geo, build_obs = obs >= geo_rbt_obs, clay >= obs_rbt_clay
+        clay, obs = clay + clay_rbt, obs + obs_rbt
+        if build_geo:
+            obs -= geo_rbt_obs
+            geodes += minute - 1
+        if build_obs:
+            clay -= obs_rbt_clay
+            obs_rbt += 1
+        clay_rbt += 1
+    return geodes
+
+
+def _wait(cost: int, stock: int, robots: int) -> int:
+    """Return the minutes `robots` need to collect `cost` when there is already `stock`."""
+    return max(0, -(-(cost - stock) // robots))
+
+
+def max_geodes(blueprint: Blueprint, total_minutes: int = 24) -> SearchResult:
+    """
+    Return the most geodes `blueprint` cracks in `total_minutes` together with the number of nodes searched and the time taken.
+    A state is (time left, ore, clay, obsidian, ore robots, clay robots, obsidian robots, geodes),
+    where the geodes already count everything a geode robot will crack until time runs out.
+    """
+    start = time.perf_counter()
+    id_, ore_rbt_ore, clay_rbt_ore, obs_rbt_ore, obs_rbt_clay, geo_rbt_ore, geo_rbt_obs = blueprint
+    max_ore_rbt = max(ore_rbt_ore, clay_rbt_ore, obs_rbt_ore, geo_rbt_ore)
+
+    best, nodes = 0, 0
+    frontier: list[tuple[int, ...]] = [(total_minutes, 0, 0, 0, 1, 0, 0, 0)]
+    while frontier:
+        time_left, ore, clay, obs, ore_rbt, clay_rbt, obs_rbt, geodes = frontier.pop()
+        nodes += 1
+        best = max(best, geodes)
+        if _geode_bound(time_left, clay, obs, clay_rbt, obs_rbt, geodes, obs_rbt_clay, geo_rbt_obs) <= best:
+            continue
+
+        # push the geode robot last so that it is popped first
+        if ore_rbt < max_ore_rbt and ore + ore_rbt * time_left < max_ore_rbt * time_left:
+            wait = _wait(ore_rbt_ore, ore, ore_rbt) + 1
+            if wait < time_left:
+                frontier.append((
+                    time_left - wait, ore + ore_rbt * wait - ore_rbt_ore, clay + clay_rbt * wait, obs + obs_rbt * wait,
+                    ore_rbt + 1, clay_rbt, obs_rbt, geodes
+                ))
+        if clay_rbt < obs_rbt_clay and clay + clay_rbt * time_left < obs_rbt_clay * time_left:
+            wait = _wait(clay_rbt_ore, ore, ore_rbt) + 1
+            if wait < time_left:
+                frontier.append((
+                    time_left - wait, ore + ore_rbt * wait - clay_rbt_ore, clay + clay_rbt * wait, obs + obs_rbt * wait,
+                    ore_rbt, clay_rbt + 1, obs_rbt, geodes
+                ))
+        if clay_rbt and obs_rbt < geo_rbt_obs and obs + obs_rbt * time_left < geo_rbt_obs * time_left:
+            wait = max(_wait(obs_rbt_ore, ore, ore_rbt), _wait(obs_rbt_clay, clay, clay_rbt)) + 1
+            if wait < time_left:
+                frontier.append((
+                    time_left - wait, ore + ore_rbt * wait - obs_rbt_ore, clay + clay_rbt * wait - obs_rbt_clay,
+                    obs + obs_rbt * wait, ore_rbt, clay_rbt, obs_rbt + 1, geodes
+                ))
+        if obs_rbt:
+            wait = max(_wait(geo_rbt_ore, ore, ore_rbt), _wait(geo_rbt_obs, obs, obs_rbt)) + 1
+            if wait < time_left:
+                frontier.append((
+                    time_left - wait, ore + ore_rbt * wait - geo_rbt_ore, clay + clay_rbt * wait,
+                    obs + obs_rbt * wait - geo_rbt_obs, ore_rbt, clay_rbt, obs_rbt, geodes + time_left - wait
+                ))
+    return SearchResult(id_, best, nodes, time.perf_counter() - start)
+
+
+def solve_blueprints(blueprints: list[Blueprint], total_minutes: int = 24, workers: Optional[int] = None) -> list[SearchResult]:
+    """
+    Run max_geodes() on every blueprint across `workers` processes (as many as CPUs if None, in this process if 1)
+    and return the results in the order of `blueprints`.
+    """
+    search = functools.partial(max_geodes, total_minutes=total_minutes)
+    if workers == 1:
+        return list(map(search, blueprints))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(search, blueprints))
+
+
 def solve_part1(puzzle_input: list[Blueprint]) -> int:
     """
     Return the sum of the blueprint id multiplied by the maximum number of geodes collected by the blueprints listed in `puzzle_input`.
     """
-    return sum(blueprint.id * depth_first_search(blueprint, 24).geo for blueprint in puzzle_input)
+    return sum(result.id * result.geodes for result in solve_blueprints(puzzle_input, 24))
 
 
 def solve_part2(puzzle_input: list[Blueprint]) -> int:
     """
     Return the product of the maximum  number of geodes collected by the blueprints listed in `puzzle_input`.
     """
-    return math.prod(
-        depth_first_search(blueprint, 32).geo
-        for blueprint in puzzle_input
-    )
+    return math.prod(result.geodes for result in solve_blueprints(puzzle_input, 32))
+
 
 if __name__ == '__main__':
     title = 'Day 19: Not Enough Minerals'
     print(title.center(50, '-'))
 
+    # test that max_geodes() agrees with depth_first_search()
+    test = parse('day19_test.txt')
+    for blueprint in test:
+        for minutes in (18, 24):
+            assert max_geodes(blueprint, minutes).geodes == depth_first_search(blueprint, minutes).geo
+    assert [result.geodes for result in solve_blueprints(test, 24, workers=1)] == [9, 12]
+    assert [result.geodes for result in solve_blueprints(test, 32, workers=2)] == [56, 62]
+
     for path in sys.argv[1:]:
         data = parse(path)
         part1 = solve_part1(data)
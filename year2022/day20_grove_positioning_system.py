@@ -10,10 +10,22 @@ If the original list is `n` items long, the alternative list will mix the elemen
 This is better than mixing a copy of encrypted file because the encrypted file can have duplicate integer values.
 When you're looking for where the item is in the mixed list, it's better to have a unique identifier
 so that you're moving the right version of the duplicate integer.
+
+`_mix()` finds and moves items in a Python list, which is O(n) per move. `_mix_blocks()` mixes a `BlockList` instead,
+a list split into about sqrt(n) blocks that remembers which block holds each item,
+so finding, removing and inserting an item are O(sqrt(n)) each.
+
+Benchmark example
+    Advent_Of_Code/year2022 $ python -c 'import day20_grove_positioning_system as day20; day20.benchmark()'
 """
 import sys
 import pathlib
 import functools
+import bisect
+import itertools
+import math
+import random
+import time
 from typing import *
 
 ZERO = 0
@@ -42,6 +54,75 @@ def _mix(encrypted_file: list[int], repeat: int = 1, decryption_key: int = 1) ->
     return [encrypted_file[d] * decryption_key for d in decrypted_order]
 
 
+class BlockList:
+    """
+    The items 0, 1, ..., n-1 in some order, stored as a list of blocks of about `block_size` items
+    where `self.owner[item]` is the block holding `item`.
+    """
+
+    def __init__(self, n: int, block_size: Optional[int] = None) -> None:
+        # blocks a few times larger than sqrt(n) balance the per-block Python overhead against moving items within a block
+        self.block_size = block_size or max(4 * math.isqrt(n), 1)
+        self.blocks: list[list[int]] = [
+            list(range(start, min(start + self.block_size, n))) for start in range(0, n, self.block_size)
+        ]
+        self.owner: list[list[int]] = [block for block in self.blocks for _ in block]
+        self.n = n
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __iter__(self) -> Iterator[int]:
+        return itertools.chain.from_iterable(self.blocks)
+
+    def __repr__(self) -> str:
+        return f'BlockList({list(self)})'
+
+    def remove(self, item: int) -> int:
+        """Remove `item` and return the position it was at."""
+        block = self.owner[item]
+        # list.index() falls back to == for other blocks, but blocks are non-empty and hold distinct items,
+        # so no other block is equal and each comparison stops at the lengths or the first items
+        b = self.blocks.index(block)
+        position = sum(map(len, self.blocks[:b]))
+        loc = block.index(item)
+        del block[loc]
+        if not block:
+            del self.blocks[b]
+        self.n -= 1
+        return position + loc
+
+    def insert(self, position: int, item: int) -> None:
+        """Insert `item` so that it ends up at `position`."""
+        ends = list(itertools.accumulate(map(len, self.blocks)))
+        b = bisect.bisect_left(ends, position)
+        if b == len(self.blocks):
+            self.blocks.append([])
+        block = self.blocks[b]
+        block.insert(position - (ends[b - 1] if b else 0), item)
+        self.owner[item] = block
+        self.n += 1
+        if len(block) > 2 * self.block_size:
+            half = block[self.block_size:]
+            del block[self.block_size:]
+            self.blocks.insert(b + 1, half)
+            for moved in half:
+                self.owner[moved] = half
+
+
+def _mix_blocks(encrypted_file: list[int], repeat: int = 1, decryption_key: int = 1) -> list[int]:
+    """Mix like _mix() but with the positions kept in a BlockList."""
+    n = len(encrypted_file)
+    decrypted_order = BlockList(n)
+    for _ in range(repeat):
+        for i, e in enumerate(encrypted_file):
+            loc = decrypted_order.remove(i)
+            k = (loc + e * decryption_key) % (n - 1)
+            decrypted_order.insert(k or n - 1, i)
+
+    return [encrypted_file[d] * decryption_key for d in decrypted_order]
+
+
 def _find_grove_coordinates(puzzle_input: list[int], mixer: Callable) -> int:
     """
     Find the number at the offset locations after the value 0 in
@@ -60,17 +141,47 @@ def parse(txt_filename: str) -> list[int]:
     return list(map(int, pathlib.Path(txt_filename).read_text().splitlines()))
 
 
-solve_part1 = functools.partial(_find_grove_coordinates, mixer=_mix)
+solve_part1 = functools.partial(_find_grove_coordinates, mixer=_mix_blocks)
 solve_part2 = functools.partial(
     _find_grove_coordinates,
-    mixer=functools.partial(_mix, repeat=10, decryption_key=KEY)
+    mixer=functools.partial(_mix_blocks, repeat=10, decryption_key=KEY)
 )
 
 
+def benchmark(sizes: Iterable[int] = (5_000, 50_000, 500_000), list_max_size: int = 50_000) -> None:
+    """
+    Print the time a single round of _mix() and _mix_blocks() takes on `sizes` random numbers.
+    _mix() is skipped on more than `list_max_size` numbers because it is quadratic.
+    """
+    rng = random.Random(20)
+    for n in sizes:
+        numbers = [rng.randint(-10_000, 10_000) for _ in range(n - 1)] + [ZERO]
+        for mixer in (_mix, _mix_blocks):
+            if mixer is _mix and n > list_max_size:
+                print(f'{n:>7} {mixer.__name__:>11}: skipped')
+                continue
+            start = time.perf_counter()
+            mixer(numbers)
+            print(f'{n:>7} {mixer.__name__:>11}: {time.perf_counter() - start:.2f}s')
+
+
 if __name__ == '__main__':
     title = 'Day 20: Grove Positioning System'
     print(title.center(50, '-'))
 
+    # test that _mix_blocks() agrees with _mix()
+    test = parse('day20_test.txt')
+    assert _mix_blocks(test) == _mix(test)
+    assert _mix_blocks(test, repeat=10, decryption_key=KEY) == _mix(test, repeat=10, decryption_key=KEY)
+    testNumbers = [(i * 7919) % 61 - 30 for i in range(200)]
+    assert _mix_blocks(testNumbers, repeat=3) == _mix(testNumbers, repeat=3)
+    testBlocks = BlockList(10, block_size=2)
+    assert testBlocks.remove(7) == 7 and testBlocks.remove(0) == 0
+    testBlocks.insert(0, 7)
+    testBlocks.insert(8, 0)
+    assert list(testBlocks) == [7, 1, 2, 3, 4, 5, 6, 8, 0, 9]
+    assert _find_grove_coordinates(test, _mix_blocks) == _find_grove_coordinates(test, _mix) == 3
+
     for path in sys.argv[1:]:
         data = parse(path)
         part1 = solve_part1(data)
@@ -10,11 +10,17 @@ For a solution to part 2 that doesn't involve sympy, see this Reddit user's hack
 https://www.reddit.com/r/adventofcode/comments/zrav4h/comment/j13fuad/?utm_source=share&utm_medium=web2x&context=3
 I ultimately adopted using sympy to solve for 'humn' monkey's integer value because the above solution
 relies on the assumption that 'humn''s number is not multiplied by itself.
+
+Both parts now run on an evaluation plan compiled from the jobs: the monkeys in topological order, so every
+shared subresult is computed once and deep job chains don't hit the recursion limit. Part 2 carries every number
+as exact `Fraction` coefficients (a, b) of a * humn + b, which stays affine as long as 'humn' is never multiplied
+by itself or divided into, and solves the resulting linear equation at 'root' directly. Only when an expression
+turns out non-linear is sympy imported to solve it.
 """
 import sys
 import pathlib
 import operator
-import sympy
+from fractions import Fraction
 from typing import *
 
 OPERATORS: dict[str, Callable] = {
@@ -22,9 +28,9 @@ OPERATORS: dict[str, Callable] = {
     '-': operator.sub,
     '*': operator.mul,
     '/': operator.truediv,
-    '=': sympy.Eq   # used in part 2
 }
 MonkeyJobs = dict[str, tuple[str] | int]
+Affine = tuple[Fraction, Fraction]   # (a, b) stands for a * humn + b
 
 
 def parse(txt_filename: str) -> MonkeyJobs:
@@ -52,28 +58,149 @@ def recursively_evaluate(jobs: MonkeyJobs, name: str) -> int:
         )
 
 
+def compile_plan(jobs: MonkeyJobs, root: str = 'root') -> list[str]:
+    """
+    Return the names of the monkeys that `root` depends on (including itself) in an order
+    where every monkey comes after the two monkeys it waits for.
+    """
+    plan: list[str] = []
+    done: set[str] = set()
+    stack = [(root, False)]
+    while stack:
+        name, expanded = stack.pop()
+        if name in done:
+            continue
+        if expanded or not isinstance(jobs[name], tuple):
+            done.add(name)
+            plan.append(name)
+            continue
+        m1, _, m2 = jobs[name]
+        stack.append((name, True))
+        stack.extend((m, False) for m in (m2, m1) if m not in done)
+    return plan
+
+
+def evaluate(jobs: MonkeyJobs, plan: Optional[list[str]] = None) -> dict[str, Fraction]:
+    """
+    Return the exact number yelled out by every monkey in the plan (by default, the one for 'root').
+    """
+    values: dict[str, Fraction] = {}
+    for name in plan or compile_plan(jobs):
+        job = jobs[name]
+        if isinstance(job, tuple):
+            m1, op, m2 = job
+            values[name] = OPERATORS[op](values[m1], values[m2])
+        else:
+            values[name] = Fraction(job)
+    return values
+
+
+def _affine(op: str, left: Affine, right: Affine) -> Optional[Affine]:
+    """
+    Return the coefficients of `left op right`, or None if the result is not affine in 'humn'.
+    """
+    (a1, b1), (a2, b2) = left, right
+    if op == '+':
+        return a1 + a2, b1 + b2
+    if op == '-':
+        return a1 - a2, b1 - b2
+    if op == '*':
+        return None if a1 and a2 else (a1 * b2 + a2 * b1, b1 * b2)
+    return None if a2 else (a1 / b2, b1 / b2)
+
+
+def solve_linear(jobs: MonkeyJobs, unknown: str = 'humn', root: str = 'root') -> Optional[Fraction]:
+    """
+    Return the number `unknown` has to yell out for both monkeys that `root` waits for to yell out the same number,
+    or None if either side is not an affine function of `unknown`.
+    """
+    coefficients: dict[str, Affine] = {}
+    for name in compile_plan(jobs, root)[:-1]:
+        job = jobs[name]
+        if name == unknown:
+            coefficients[name] = Fraction(1), Fraction(0)
+        elif isinstance(job, tuple):
+            m1, op, m2 = job
+            result = _affine(op, coefficients[m1], coefficients[m2])
+            if result is None:
+                return None
+            coefficients[name] = result
+        else:
+            coefficients[name] = Fraction(0), Fraction(job)
+    m1, _, m2 = jobs[root]
+    (a1, b1), (a2, b2) = coefficients[m1], coefficients[m2]
+    if a1 == a2:
+        raise ValueError(f"The equation at {root!r} has no unique solution for {unknown!r}.")
+    return (b2 - b1) / (a1 - a2)
+
+
 def solve_part1(puzzle_input: MonkeyJobs) -> int:
     """Return the integer yelled out by the monkey named 'root'."""
-    return round(recursively_evaluate(puzzle_input, 'root'))
+    return round(evaluate(puzzle_input)['root'])
 
 
 def solve_part2(puzzle_input: MonkeyJobs) -> int:
     """
-    First, update the monkey jobs dictionary by
-        - changing 'root' monkey's operation symbol to '='
-        - changing 'humn' monkey to sympy.Symbol('humn').
-    Return the solution for the integer value of sympy.Symbol('humn') via sympy.solve().
+    Return the integer that the 'humn' monkey has to yell out for the 'root' monkey's equality check to pass,
+    solving for it with sympy only if the jobs are not linear in 'humn'.
+    """
+    humn = solve_linear(puzzle_input)
+    if humn is None:
+        return _solve_part2_sympy(puzzle_input)
+    if humn.denominator != 1:
+        raise ValueError(f"'humn' would have to yell out {humn}, which is not an integer.")
+    return humn.numerator
+
+
+def _solve_part2_sympy(puzzle_input: MonkeyJobs) -> int:
     """
+    First, update the monkey jobs dictionary by changing 'humn' monkey to sympy.Symbol('humn'),
+    then equate the expressions of the two monkeys that 'root' waits for.
+    Return the first integer solution for sympy.Symbol('humn') via sympy.solve().
+    """
+    import sympy
+
     m1, _, m2 = puzzle_input['root']
     humn = sympy.Symbol('humn')
-    jobs_updated = {**puzzle_input, 'root': (m1, '=', m2), 'humn': humn}
-    return next(iter(sympy.solve(recursively_evaluate(jobs_updated, 'root'), humn)))
+    jobs_updated = {**puzzle_input, 'humn': humn}
+    equation = sympy.Eq(recursively_evaluate(jobs_updated, m1), recursively_evaluate(jobs_updated, m2))
+    for solution in sympy.solve(equation, humn):
+        if solution.is_integer:
+            return int(solution)
+    raise ValueError("'humn' has no integer to yell out that passes the equality check.")
 
 
 if __name__ == '__main__':
     title = 'Day 21: Monkey Math'
     print(title.center(50, '-'))
 
+    # test the evaluation plan and the linear solver against the recursive and sympy solutions
+    test = parse('day21_test.txt')
+    plan = compile_plan(test)
+    assert sorted(plan) == sorted(test) and plan[-1] == 'root'
+    assert all(plan.index(m) < plan.index(name) for name in plan if isinstance(test[name], tuple)
+               for m in test[name][::2])
+    assert solve_part1(test) == round(recursively_evaluate(test, 'root')) == 152
+    assert solve_linear(test) == _solve_part2_sympy(test) == solve_part2(test) == 301
+
+    # 'humn' squared isn't linear, so part 2 falls back to sympy
+    squared = {'root': ('a', '+', 'b'), 'a': ('humn', '*', 'humn'), 'humn': 5, 'b': 16}
+    assert solve_linear(squared) is None and solve_part2(squared) == -4
+
+    # no integer solution
+    halved = {'root': ('a', '+', 'b'), 'a': ('humn', '*', 'two'), 'two': 2, 'humn': 1, 'b': 3}
+    assert solve_linear(halved) == Fraction(3, 2)
+    try:
+        solve_part2(halved)
+        raise AssertionError('solve_part2() should reject non-integer solutions')
+    except ValueError:
+        pass
+
+    # a job chain deeper than the recursion limit
+    chain = {'root': ('m0', '+', 'c'), 'one': 1, 'two': 2, 'c': 20000, 'humn': 3, 'm5000': ('humn', '*', 'two')}
+    chain.update({f'm{i}': (f'm{i + 1}', '+', 'one') for i in range(5000)})
+    assert solve_part1(chain) == 3 * 2 + 5000 + 20000 and solve_part2(chain) == 7500
+
     for path in sys.argv[1:]:
         data = parse(path)
         part1 = solve_part1(data)
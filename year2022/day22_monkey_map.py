@@ -8,10 +8,17 @@ Part 1 is adapted from Peter Norvig's solution by finding the warp path by walki
 
 Part 2 is adapted from this reddit user's solution (https://www.reddit.com/r/adventofcode/comments/zsct8w/comment/j1b0fp7/?utm_source=share&utm_medium=web2x&context=3). It finds the warp path beforehand and saves it in a dictionary, which you look up when executing the commands.
 
+To replay many command strings against the same map, `MapProgram` compiles the map into a jump table over
+(tile, facing) states. Walking forward from any state traces a chain that either stops at a wall or loops back on itself,
+so moving n steps is a single lookup into that chain and a command string runs in O(commands).
+A compiled program can be saved to disk and reloaded by the hash of its map.
+
 Since I wrote a lot of utility functions, the main block executes unit tests with series of `assert` statements.
 """
 import sys
 import pathlib
+import hashlib
+import json
 import re
 import operator
 import collections
@@ -38,6 +45,8 @@ class Directions(Vector, Enum):
     LEFT: Vector = (0, -1)
 
 
+CLOCKWISE: list[Vector] = list(Directions)
+
 CLOCKWISE_CONCAVE_INTERSECTIONS: dict[Vector, Vector] = {
     Directions.DOWN: Directions.RIGHT,
     Directions.LEFT: Directions.DOWN,
@@ -79,8 +88,8 @@ def turn(facing: Vector, right: bool = True) -> Vector:
     Return the new direction 90-degrees rotation
     to the right (if right is True) or left (if False) of `facing`.
     """
-    idx = list(Directions).index(facing)
-    return list(Directions)[(idx + 1) % 4] if right else list(Directions)[(idx - 1) % 4]
+    idx = CLOCKWISE.index(facing)
+    return CLOCKWISE[(idx + 1) % 4] if right else CLOCKWISE[(idx - 1) % 4]
 
 
 def reverse(facing: Vector) -> Vector:
@@ -93,7 +102,7 @@ def follow_commands(grid: Grid, commands: Commands, on_cube: bool = False) -> tu
     """
     Follow the commands and return the final coordinate on Grid and the direction the agent is facing.
     """
-    cube: CubeWrap = construct_cubewrap(grid)
+    cube: Optional[CubeWrap] = construct_cubewrap(grid) if on_cube else None
 
     loc: Coord = 0, min(coord[COLUMN] for coord in grid if coord[ROW] == 0)
     facing: Vector = Directions.RIGHT
@@ -270,6 +279,112 @@ def construct_cubewrap(grid: Grid) -> CubeWrap:
     }
 
 
+def map_hash(grid: Grid, on_cube: bool = False) -> str:
+    """Return a hex digest identifying the tiles of `grid` and how its edges wrap."""
+    text = repr((on_cube, sorted(grid.items())))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class MapProgram:
+    """
+    A map compiled into chains of states, where a state is `4 * tile + facing` with `tile` indexing `self.tiles`
+    and `facing` indexing CLOCKWISE.
+
+    Each chain lists the states visited by walking forward; a chain either ends at a state facing a WALL
+    or is `cyclic` and wraps around to its start. `self.chain[state]` and `self.offset[state]` locate each state.
+    """
+
+    def __init__(self, tiles: list[Coord], chains: list[list[int]], cyclic: list[bool]) -> None:
+        self.tiles = tiles
+        self.chains = chains
+        self.cyclic = cyclic
+        self.index: dict[Coord, int] = {tile: i for i, tile in enumerate(tiles)}
+        self.chain: list[int] = [0] * (4 * len(tiles))
+        self.offset: list[int] = [0] * (4 * len(tiles))
+        for c, states in enumerate(chains):
+            for i, state in enumerate(states):
+                self.chain[state], self.offset[state] = c, i
+
+    def __repr__(self) -> str:
+        return f'MapProgram(tiles={len(self.tiles)}, chains={len(self.chains)})'
+
+    @classmethod
+    def compile(cls, grid: Grid, on_cube: bool = False) -> 'MapProgram':
+        """Compile `grid` by taking one step from every (tile, facing) and linking the steps into chains."""
+        cube: Optional[CubeWrap] = construct_cubewrap(grid) if on_cube else None
+        tiles: list[Coord] = sorted(coord for coord, value in grid.items() if value == OPEN)
+        index: dict[Coord, int] = {tile: i for i, tile in enumerate(tiles)}
+
+        step: list[int] = []
+        for tile in tiles:
+            for facing in CLOCKWISE:
+                new_loc, new_facing = move_forward(tile, facing, 1, grid, cube)
+                step.append(4 * index[new_loc] + CLOCKWISE.index(new_facing))
+
+        has_predecessor: list[bool] = [False] * len(step)
+        for state, next_state in enumerate(step):
+            if next_state != state:
+                has_predecessor[next_state] = True
+
+        chains, cyclic, visited = [], [], [False] * len(step)
+        heads = [state for state in range(len(step)) if not has_predecessor[state]]
+        for head in heads + list(range(len(step))):
+            if visited[head]:
+                continue
+            states, state = [], head
+            while not visited[state]:
+                visited[state] = True
+                states.append(state)
+                state = step[state]
+            chains.append(states)
+            cyclic.append(state == head and step[states[-1]] != states[-1])
+        return cls(tiles, chains, cyclic)
+
+    def forward(self, state: int, n: int) -> int:
+        """Return the state after walking `n` steps forward from `state`."""
+        states = self.chains[self.chain[state]]
+        i = self.offset[state] + n
+        return states[i % len(states)] if self.cyclic[self.chain[state]] else states[min(i, len(states) - 1)]
+
+    def execute(self, commands: Commands) -> tuple[Coord, Vector]:
+        """Follow the commands from the leftmost tile of the top row facing right like follow_commands()."""
+        start: Coord = min(tile for tile in self.tiles if tile[ROW] == 0)
+        state: int = 4 * self.index[start] + CLOCKWISE.index(Directions.RIGHT)
+        for move in commands:
+            match move:
+                case 'R':
+                    state += 1 if state % 4 < 3 else -3
+                case 'L':
+                    state += -1 if state % 4 > 0 else 3
+                case _ as n:
+                    state = self.forward(state, n)
+        return self.tiles[state // 4], CLOCKWISE[state % 4]
+
+    def execute_many(self, batch: Iterable[Commands]) -> list[tuple[Coord, Vector]]:
+        return [self.execute(commands) for commands in batch]
+
+    def save(self, path: str | pathlib.Path) -> None:
+        pathlib.Path(path).write_text(
+            json.dumps({'tiles': self.tiles, 'chains': self.chains, 'cyclic': self.cyclic})
+        )
+
+    @classmethod
+    def load(cls, path: str | pathlib.Path) -> 'MapProgram':
+        program = json.loads(pathlib.Path(path).read_text())
+        return cls([tuple(tile) for tile in program['tiles']], program['chains'], program['cyclic'])
+
+    @classmethod
+    def load_or_compile(cls, grid: Grid, on_cube: bool, directory: str | pathlib.Path) -> 'MapProgram':
+        """Reload the program of `grid` saved in `directory` under its map hash, or compile and save it there."""
+        path = pathlib.Path(directory) / f'{map_hash(grid, on_cube)}.json'
+        if path.exists():
+            return cls.load(path)
+        program = cls.compile(grid, on_cube)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        program.save(path)
+        return program
+
+
 def parse(txt_filename: str) -> tuple[Grid, Commands]:
     """
     Return the content of the file as Grid and Commands
@@ -282,12 +397,12 @@ def parse(txt_filename: str) -> tuple[Grid, Commands]:
     return Grid(lines, skip=(OFF_THE_MAP,), directions=list(Directions)), commands
 
 
-def solve_part1(*puzzle_inputs) -> int:
-    return compute_final_password(*follow_commands(*puzzle_inputs))
+def solve_part1(grid: Grid, commands: Commands) -> int:
+    return compute_final_password(*MapProgram.compile(grid).execute(commands))
 
 
-def solve_part2(*puzzle_inputs) -> int:
-    return compute_final_password(*follow_commands(*puzzle_inputs, on_cube=True))
+def solve_part2(grid: Grid, commands: Commands) -> int:
+    return compute_final_password(*MapProgram.compile(grid, on_cube=True).execute(commands))
 
 
 if __name__ == '__main__':
@@ -344,6 +459,20 @@ if __name__ == '__main__':
     assert test_cube[A] == B and test_cube[(B[0], reverse(B[1]))] == (A[0], reverse(A[1]))
     assert test_cube[C] == D and test_cube[(D[0], reverse(D[1]))] == (C[0], reverse(C[1]))
 
+    # test that the compiled MapProgram agrees with follow_commands()
+    _, test_commands = parse('day22_test.txt')
+    test_batch = [test_commands, (5, 'L', 30, 'R', 'R', 2), (100, 'L', 'L', 'L', 7, 'R', 12)]
+    for test_on_cube in (False, True):
+        test_program = MapProgram.compile(boards, test_on_cube)
+        assert test_program.execute_many(test_batch) == [
+            follow_commands(boards, commands, on_cube=test_on_cube) for commands in test_batch
+        ]
+        test_path = pathlib.Path(f'day22_program_test_{test_on_cube}.json')
+        test_program.save(test_path)
+        assert MapProgram.load(test_path).execute_many(test_batch) == test_program.execute_many(test_batch)
+        test_path.unlink()
+    assert map_hash(boards) == map_hash(parse('day22_test.txt')[0]) != map_hash(boards, on_cube=True)
+
     for file in sys.argv[1:]:
         data = parse(file)
         part1 = solve_part1(*data)
@@ -6,6 +6,11 @@ Usage example:
 
 Inspired by Peter Norvig's solution for part 2 on how to stop an iterator (https://colab.research.google.com/github/norvig/pytudes/blob/main/ipynb/Advent-2022.ipynb#scrollTo=X7XYM8aji_oO)
 
+`diffuse()` is the reference implementation. For many rounds, `ElfArray` holds the elves as a NumPy boolean array
+and computes neighbors, proposals and collisions with array shifts; `ElfBits` does the same with the whole grid
+packed into one Python integer.
+Both grow their grid only when an elf reaches the border.
+
 The main block includes unit tests on a smaller grid.
 """
 import sys
@@ -13,8 +18,11 @@ import pathlib
 import collections
 import functools
 import itertools
+import operator
 from typing import *
 
+import numpy as np
+
 Coord = tuple[int, int]     # (row, column)
 Vector = Coord
 Proposals = dict[Coord, list[Coord]]
@@ -150,14 +158,169 @@ def count_ground_cells(grid: Grid) -> int:
     return (r1 - r0 + 1) * (c1 - c0 + 1) - len(elves)
 
 
+class ElfArray:
+    """
+    Elves as a boolean NumPy array whose outermost ring of cells is kept empty,
+    where `self.offset` is the (row, column) coordinate of `self.cells[0, 0]`.
+    """
+
+    def __init__(self, lines: list[str], margin: int = 8) -> None:
+        self.cells = np.array([[value == ELF for value in line] for line in lines], dtype=bool)
+        self.offset: Coord = (0, 0)
+        self.margin = margin
+        self.rounds = 0
+        self.grow()
+
+    def grow(self) -> None:
+        """Pad the array with `self.margin` cells on every side if an elf sits on its outermost ring."""
+        cells = self.cells
+        if cells.size and not (cells[0].any() or cells[-1].any() or cells[:, 0].any() or cells[:, -1].any()):
+            return
+        self.cells = np.pad(cells, self.margin)
+        self.offset = self.offset[ROW] - self.margin, self.offset[COLUMN] - self.margin
+
+    @staticmethod
+    def shift(cells: 'np.ndarray', vector: Vector) -> 'np.ndarray':
+        """Return `cells` moved by `vector`, filling the vacated cells with False."""
+        drow, dcol = vector
+        height, width = cells.shape
+        shifted = np.zeros_like(cells)
+        shifted[max(drow, 0): height + min(drow, 0), max(dcol, 0): width + min(dcol, 0)] = \
+            cells[max(-drow, 0): height - max(drow, 0), max(-dcol, 0): width - max(dcol, 0)]
+        return shifted
+
+    def step(self) -> bool:
+        """Play one round and return whether any elf moved."""
+        cells = self.cells
+        # occupied[d][r, c] is True if the cell in direction d of (r, c) has an elf
+        occupied = {direction: self.shift(cells, (-direction[ROW], -direction[COLUMN])) for direction in DIRECTIONS}
+        undecided = cells & functools.reduce(np.logical_or, occupied.values())
+
+        targets = []
+        for i in range(4):
+            direction, *sides = PROPOSAL_RULES[(self.rounds + i) % 4]
+            proposing = undecided & ~(occupied[direction] | occupied[sides[0]] | occupied[sides[1]])
+            undecided &= ~proposing
+            targets.append((direction, self.shift(proposing, direction)))
+
+        counts = sum(target.astype(np.uint8) for _, target in targets)
+        moved = False
+        cells = cells.copy()
+        for direction, target in targets:
+            target &= counts == 1
+            if target.any():
+                moved = True
+                cells &= ~self.shift(target, (-direction[ROW], -direction[COLUMN]))
+                cells |= target
+        if moved:
+            self.cells = cells
+            self.rounds += 1
+            self.grow()
+        return moved
+
+    def elves(self) -> set[Coord]:
+        r0, c0 = self.offset
+        return {(int(row) + r0, int(column) + c0) for row, column in zip(*np.nonzero(self.cells))}
+
+
+class ElfBits:
+    """
+    Elves as the bits of one integer where (row, column) of the padded grid is bit `row * self.width + column`.
+    Like ElfArray, the outermost ring of cells is kept empty so shifted bits never wrap onto real cells.
+    """
+
+    def __init__(self, lines: list[str], margin: int = 8) -> None:
+        self.height, self.width = len(lines), max(map(len, lines), default=0)
+        self.cells: int = sum(
+            1 << (row * self.width + column)
+            for row, line in enumerate(lines)
+            for column, value in enumerate(line)
+            if value == ELF
+        )
+        self.offset: Coord = (0, 0)
+        self.margin = margin
+        self.rounds = 0
+        self.grow(force=True)
+
+    def grow(self, force: bool = False) -> None:
+        """Re-pack the grid with `self.margin` extra cells on every side if an elf sits on its outermost ring."""
+        h, w, m = self.height, self.width, self.margin
+        row_mask = (1 << w) - 1
+        if not force and not self.cells & self.ring:
+            return
+        self.cells = sum(
+            ((self.cells >> (row * w)) & row_mask) << ((row + m) * (w + 2 * m) + m)
+            for row in range(h)
+        )
+        self.height, self.width = h + 2 * m, w + 2 * m
+        self.offset = self.offset[ROW] - m, self.offset[COLUMN] - m
+        self.full = (1 << (self.height * self.width)) - 1
+        row_mask = (1 << self.width) - 1
+        side_columns = sum(1 << (row * self.width) | 1 << (row * self.width + self.width - 1) for row in range(self.height))
+        self.ring = row_mask | row_mask << ((self.height - 1) * self.width) | side_columns
+
+    def shift(self, cells: int, vector: Vector) -> int:
+        """Return `cells` moved by `vector`."""
+        k = vector[ROW] * self.width + vector[COLUMN]
+        return (cells << k) & self.full if k >= 0 else cells >> -k
+
+    def step(self) -> bool:
+        """Play one round and return whether any elf moved."""
+        cells = self.cells
+        occupied = {direction: self.shift(cells, (-direction[ROW], -direction[COLUMN])) for direction in DIRECTIONS}
+        undecided = cells & functools.reduce(operator.or_, occupied.values())
+
+        targets: dict[Vector, int] = {}
+        for i in range(4):
+            direction, *sides = PROPOSAL_RULES[(self.rounds + i) % 4]
+            proposing = undecided & ~(occupied[direction] | occupied[sides[0]] | occupied[sides[1]])
+            undecided &= ~proposing
+            targets[direction] = self.shift(proposing, direction)
+
+        # only elves facing each other across a cell can propose the same cell
+        collisions = targets[North] & targets[South] | targets[West] & targets[East]
+        moved = False
+        for direction, target in targets.items():
+            target &= ~collisions
+            if target:
+                moved = True
+                cells &= ~self.shift(target, (-direction[ROW], -direction[COLUMN]))
+                cells |= target
+        if moved:
+            self.cells = cells
+            self.rounds += 1
+            self.grow()
+        return moved
+
+    def elves(self) -> set[Coord]:
+        r0, c0 = self.offset
+        cells, elves = self.cells, set()
+        while cells:
+            low = cells & -cells
+            row, column = divmod(low.bit_length() - 1, self.width)
+            elves.add((row + r0, column + c0))
+            cells ^= low
+        return elves
+
+
+ENGINES = {'numpy': ElfArray, 'bits': ElfBits}
+DEFAULT_ENGINE = 'numpy'
+
+
 def parse(txt_filename: str) -> list[str]:
     """Return the file content as list of strings"""
     return pathlib.Path(txt_filename).read_text().splitlines()
 
 
-def solve_part1(puzzle_input: list[str]) -> int:
+def solve_part1(puzzle_input: list[str], engine: str = DEFAULT_ENGINE) -> int:
     """Count the number of ground cells after 10 rounds."""
     n = 10
+    if engine in ENGINES:
+        elves = ENGINES[engine](puzzle_input)
+        for _ in range(n):
+            if not elves.step():
+                break
+        return count_ground_cells(Grid(dict.fromkeys(elves.elves(), ELF)))
     return count_ground_cells(
         diffuse_n_rounds(
             Grid(puzzle_input, default=GROUND),
@@ -166,8 +329,13 @@ def solve_part1(puzzle_input: list[str]) -> int:
     )
 
 
-def solve_part2(puzzle_input: list[str]) -> int:
+def solve_part2(puzzle_input: list[str], engine: str = DEFAULT_ENGINE) -> int:
     """Count the number of the first round where no elf moves."""
+    if engine in ENGINES:
+        elves = ENGINES[engine](puzzle_input)
+        while elves.step():
+            pass
+        return elves.rounds + 1
     rounds = diffuse(Grid(puzzle_input, default=GROUND)) # (grid, grid after 1 diffusion, grid after 2 rounds, ...)
     # if it takes 19 rounds of diffusion until no elf can move, `rounds` would include 20 elements
     return len(list(rounds))
@@ -261,6 +429,23 @@ if __name__ == '__main__':
         )
     )
 
+    # test that ElfArray and ElfBits agree with diffuse() round by round
+    for lines in (small, large):
+        reference = [
+            {coord for coord, value in grid.items() if value == ELF}
+            for grid in diffuse(Grid(lines, default=GROUND))
+        ]
+        for Engine in (ElfBits, ElfArray):
+            elves = Engine(lines, margin=1)
+            states = [elves.elves()]
+            while elves.step():
+                states.append(elves.elves())
+            assert states == reference
+            assert elves.rounds + 1 == len(reference)
+    for engine in ENGINES:
+        assert solve_part1(large, engine=engine) == solve_part1(large, engine='reference') == 110
+        assert solve_part2(large, engine=engine) == solve_part2(large, engine='reference') == 20
+
     for file in sys.argv[1:]:
         data = parse(file)
         part1 = solve_part1(data)
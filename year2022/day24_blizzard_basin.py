@@ -4,6 +4,9 @@
 Usage example
     Advent_Of_code/year2022 $ python day24_blizzard_basin.py day24_test.txt day24_input.txt
 
+Benchmark example
+    Advent_Of_code/year2022 $ python -c 'import day24_blizzard_basin as day24; day24.benchmark()'
+
 The key idea to solving the search problem efficiently is to save the state of the grid only every m minutes
 where m is a common multiple of the width and height of the basin (excluding the walls from the length counts).
 
@@ -12,6 +15,10 @@ The code makes two assumptions:
     i.e. there are no vertically-flowing blizzards in the columns where the exit and entrance tiles are located.
     - There is a path from the entrance to the exit of the basin and a reverse path too.
 
+Besides A*, there is a bitset engine (`BitsetBasin`) that stores each row's blizzards as integer bitmasks,
+one per direction, and advances the whole reachable frontier one minute at a time as one bitmask per row.
+Pass `engine='bitset'` to `solve_part1()` or `solve_part2()` to use it.
+
 The main block of the code contains series of `assert` statements to test the class method and path-search code on a simple example.
 """
 import sys
@@ -20,6 +27,8 @@ import collections
 import math
 import queue
 import functools
+import random
+import time
 from typing import *
 
 Coord = tuple[int, int]  # (row, column)
@@ -122,6 +131,46 @@ class Grid(dict[Coord, str]):
         )
 
 
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    frames: int
+    bytes: int
+
+
+class EmptiesCache(collections.OrderedDict[int, set[Coord]]):
+    """
+    A least-recently-used cache of empty coordinates per minute.
+    A missing minute is computed with `compute` and the oldest minute is evicted once there are more than `capacity`.
+    """
+
+    def __init__(self, compute: Callable[[int], set[Coord]], capacity: Optional[int] = 1024) -> None:
+        super().__init__()
+        self.compute = compute
+        self.capacity = capacity
+        self.hits, self.misses = 0, 0
+
+    def __getitem__(self, t: int) -> set[Coord]:
+        if t in self:
+            self.hits += 1
+            self.move_to_end(t)
+            return super().__getitem__(t)
+        self.misses += 1
+        empties = self[t] = self.compute(t)
+        if self.capacity is not None and len(self) > self.capacity:
+            self.popitem(last=False)
+        return empties
+
+    def stats(self) -> CacheStats:
+        """Return the hit and miss counts, the number of cached minutes, and the bytes held by the cached sets."""
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            frames=len(self),
+            bytes=sum(sys.getsizeof(empties) for empties in self.values())
+        )
+
+
 class BasinState(NamedTuple):
     """
     A namedtuple to store the state of the agent, where they are (`loc`) at what time (`time`)
@@ -156,9 +205,9 @@ class Node:
 class BasinProblem:
     """A class object representing the search problem"""
 
-    def __init__(self, grid: Grid) -> None:
+    def __init__(self, grid: Grid, cache_size: Optional[int] = 1024) -> None:
         """
-        Set up the problem and cache the empty ground locations for all future times.
+        Set up the problem and a cache of at most `cache_size` minutes of empty ground locations (None for no limit).
 
         The initial state is the upper-left most tile that is EMPTY at time 0.
         The goal is located at the lower-right most tile that is EMPTY.
@@ -177,32 +226,31 @@ class BasinProblem:
         self.initial: BasinState = BasinState(time=0, loc=min(initial_empties))
         self.goal: BasinState = BasinState(time=None, loc=max(initial_empties))
 
-        self.empties: dict[int, set[Coord]] = collections.defaultdict(set)
-        self.cache_empties()
+        self.basin_coords: set[Coord] = {
+            coord for coord, value in self.grid.items() if value != WALL
+        }
+        self.blizzards: dict[str, list[Coord]] = {
+            arrow: [coord for coord in self.basin_coords if self.grid[coord] == arrow]
+            for arrow in BLIZZARDS
+        }
+        self.empties: EmptiesCache = EmptiesCache(self.compute_empties, capacity=cache_size)
 
     def __repr__(self) -> str:
         return f'BasinProblem looking for the shortest path from {self.initial} to {self.goal.loc}'
 
-    def cache_empties(self) -> None:
+    def compute_empties(self, t: int) -> set[Coord]:
         """
-        Store in `self.empties[t]` all the coordinates that are empty of blizzards
-        at time t for t between 0 and `m`, the least common multiple of basin shape parameters.
+        Return all the coordinates that are empty of blizzards at time t
+        by sliding each blizzard from its initial position t steps in its direction.
         """
-        basin_coords: set[Coord] = {
-            coord for coord, value in self.grid.items() if value != WALL
-        }
-        blizzards: dict[str, set[Coord]] = {
-            arrow: {coord for coord in basin_coords if self.grid[coord] == arrow}
-            for arrow in BLIZZARDS
-        }
-        m: int = math.lcm(self.width, self.height)
-
-        for t in range(m):
-            self.empties[t] = basin_coords - set().union(*blizzards.values())
-            blizzards = {
-                arrow: set(slide_mod(blizzards[arrow], delta, (self.height, self.width)))
-                for arrow, delta in ARROWS.items()
-            }
+        shape: Vector = self.height, self.width
+        occupied: set[Coord] = set().union(
+            *(
+                slide_mod(self.blizzards[arrow], (drow * t, dcol * t), shape)
+                for arrow, (drow, dcol) in ARROWS.items()
+            )
+        )
+        return self.basin_coords - occupied
 
     def actions(self, state: BasinState) -> Iterator[BasinState]:
         """
@@ -281,19 +329,92 @@ def reverse_trip(problem: BasinProblem, offset: int) -> BasinProblem:
 solve = functools.partial(a_star_search, goal_test=goal_test, successors=successors)
 
 
+class BitsetBasin:
+    """
+    The basin as row bitmasks, where bit c - 1 of a row stands for column c.
+
+    Horizontal blizzards are rotated within their row and vertical blizzards are looked up
+    from the row they started in, so one minute of the search costs O(height) big-int operations.
+    """
+
+    def __init__(self, lines: list[str]) -> None:
+        inner: list[str] = [line[1:-1] for line in lines[1:-1]]
+        self.height, self.width = len(inner), len(inner[0])
+        self.full: int = (1 << self.width) - 1
+        self.entrance: int = lines[0].index(EMPTY) - 1
+        self.exit: int = lines[-1].index(EMPTY) - 1
+        self.blizzards: dict[str, list[int]] = {
+            arrow: [
+                sum(1 << column for column, value in enumerate(line) if value == arrow)
+                for line in inner
+            ]
+            for arrow in BLIZZARDS
+        }
+
+    def __repr__(self) -> str:
+        return f'BitsetBasin(height={self.height}, width={self.width})'
+
+    def blocked(self, row: int, t: int) -> int:
+        """Return the bitmask of columns in `row` (0-indexed) occupied by blizzards at time `t`."""
+        h, w = self.height, self.width
+        k = t % w
+        right, left = self.blizzards['>'][row], self.blizzards['<'][row]
+        return (
+            (right << k | right >> (w - k)) & self.full
+            | (left >> k | left << (w - k)) & self.full
+            | self.blizzards['v'][(row - t) % h]
+            | self.blizzards['^'][(row + t) % h]
+        )
+
+    def crossing_time(self, start_time: int = 0, forward: bool = True) -> int:
+        """
+        Return the fewest minutes to cross the basin starting at `start_time`,
+        from the entrance to the exit if `forward` else from the exit to the entrance.
+        """
+        h = self.height
+        first_row, last_row = (0, h - 1) if forward else (h - 1, 0)
+        start_bit = 1 << (self.entrance if forward else self.exit)
+        goal_bit = 1 << (self.exit if forward else self.entrance)
+        period: int = math.lcm(self.width, h)
+
+        frontier: list[int] = [0] * h
+        checkpoint: Optional[list[int]] = None
+        t = start_time
+        while True:
+            if frontier[last_row] & goal_bit:
+                return t + 1 - start_time
+            if (t - start_time) % period == 0:
+                if frontier == checkpoint:
+                    raise Exception('Never found a path')
+                checkpoint = frontier
+            t += 1
+            spread = [row | row << 1 | row >> 1 for row in frontier]
+            spread[first_row] |= start_bit     # we can always wait at the start and step in later
+            frontier = [
+                (spread[i] | (frontier[i - 1] if i > 0 else 0) | (frontier[i + 1] if i < h - 1 else 0))
+                & self.full & ~self.blocked(i, t)
+                for i in range(h)
+            ]
+
+
+ENGINES = 'astar', 'bitset'
+
+
 def parse(txt_filename: str) -> list[str]:
     """Return the content of the file as list of strings"""
     return pathlib.Path(txt_filename).read_text().splitlines()
 
 
-def solve_part1(puzzle_input: list[str]) -> int:
+def solve_part1(puzzle_input: list[str], engine: str = 'astar') -> int:
     """Return the fewest number of minutes required to exit the basin"""
+    if engine == 'bitset':
+        return BitsetBasin(puzzle_input).crossing_time()
     grid = Grid(puzzle_input)
     problem = BasinProblem(grid)
     return int(solve(problem).cost)
 
 
-def solve_part2(puzzle_input: list[str]) -> int:
+def solve_part2(puzzle_input: list[str], engine: str = 'astar') -> int:
     """
     Make a three-leg trip where
         leg 1 is from basin entrance to the exit,
@@ -301,6 +422,12 @@ def solve_part2(puzzle_input: list[str]) -> int:
         leg 3 is a repeat of leg 1.
     Return the number of minutes it takes to complete the whole trip.
     """
+    if engine == 'bitset':
+        basin = BitsetBasin(puzzle_input)
+        leg1 = basin.crossing_time(0)
+        leg2 = basin.crossing_time(leg1, forward=False)
+        leg3 = basin.crossing_time(leg1 + leg2)
+        return leg1 + leg2 + leg3
     grid = Grid(puzzle_input)
     problem = BasinProblem(grid)
 
@@ -310,6 +437,46 @@ def solve_part2(puzzle_input: list[str]) -> int:
     return int(leg1.cost + leg2.cost + leg3.cost)
 
 
+BENCHMARK_SHAPES: list[tuple[int, int]] = [(25, 120), (50, 200), (100, 400), (200, 800)]
+
+
+def generate_basin(height: int, width: int, density: float = 0.3, seed: int = 2022) -> list[str]:
+    """
+    Return the lines of a random `height` by `width` basin with the entrance and exit in the usual corners.
+    No vertical blizzards are placed in the entrance and exit columns so that none escape the basin.
+    """
+    rng = random.Random(seed)
+    inner = [
+        ''.join(
+            rng.choice('<>' if column in (0, width - 1) else BLIZZARDS) if rng.random() < density else EMPTY
+            for column in range(width)
+        )
+        for _ in range(height)
+    ]
+    return [
+        WALL + EMPTY + WALL * width,
+        *(WALL + line + WALL for line in inner),
+        WALL * width + EMPTY + WALL
+    ]
+
+
+def benchmark(shapes: Iterable[tuple[int, int]] = BENCHMARK_SHAPES, engines: Iterable[str] = ENGINES,
+              astar_max_cells: int = 100 * 400) -> None:
+    """
+    Print the part 1 answer and the time each engine takes on generated basins of the given (height, width) shapes.
+    A* is skipped on basins with more than `astar_max_cells` cells because it takes several minutes on them.
+    """
+    for height, width in shapes:
+        basin = generate_basin(height, width)
+        for engine in engines:
+            if engine == 'astar' and height * width > astar_max_cells:
+                print(f'{height}x{width} {engine:>6}: skipped')
+                continue
+            start = time.perf_counter()
+            answer = solve_part1(basin, engine=engine)
+            print(f'{height}x{width} {engine:>6}: {answer} minutes in {time.perf_counter() - start:.2f}s')
+
+
 if __name__ == '__main__':
     title = 'Day 24: Blizzard Basin'
     print(title.center(50, '-'))
@@ -352,8 +519,8 @@ if __name__ == '__main__':
     assert testProblem.goal.loc == (6, 5)
     assert testProblem.width == 5 and testProblem.height == 5
 
-    # test that BasinProblem.cache_empties() works
-    assert len(testProblem.empties) == math.lcm(testProblem.width, testProblem.height)
+    # test that BasinProblem.empties are computed lazily
+    assert len(testProblem.empties) == 0
     empties_at_time0 = {
         coord for coord, value in testProblem.grid.items()
         if value == EMPTY
@@ -367,6 +534,15 @@ if __name__ == '__main__':
     assert testProblem.empties[2] == empties_at_time2
     assert testProblem.empties[3] == empties_at_time3
     assert testProblem.empties[4] == empties_at_time4
+    assert testProblem.empties[math.lcm(testProblem.width, testProblem.height)] == empties_at_time0
+    assert testProblem.empties[0] == empties_at_time0
+    assert testProblem.empties.stats()[:3] == (1, 6, 6)
+
+    # test that EmptiesCache evicts the least recently used minute
+    testCache = EmptiesCache(testProblem.compute_empties, capacity=2)
+    testCache[0], testCache[1], testCache[0], testCache[2]
+    assert list(testCache) == [0, 2]
+    assert testCache.stats()[:3] == (1, 3, 2)
 
     # test that BasinProblem.actions() works
     state_at_time1 = BasinState(time=1, loc=(1, 1))
@@ -415,10 +591,22 @@ if __name__ == '__main__':
     assert testReReverseProblem.goal.loc == (6, 5)
     assert testReReverseProblem.initial.time == testNextInitialTime + testReverseSolution.cost
 
+    # test that BitsetBasin works and agrees with A*
+    testBitset = BitsetBasin(test)
+    assert testBitset.height == 5 and testBitset.width == 5
+    assert testBitset.entrance == 0 and testBitset.exit == 4
+    assert testBitset.blocked(1, 0) == 0b00001 and testBitset.blocked(1, 1) == 0b00010
+    assert testBitset.blocked(0, 1) == 0 and testBitset.blocked(4, 1) == 0b01000
+    assert testBitset.crossing_time() == testSolution.cost
+    assert testBitset.crossing_time(int(testSolution.cost), forward=False) == testReverseSolution.cost
+    testExample = generate_basin(6, 12, seed=24)
+    assert solve_part1(testExample, engine='bitset') == solve_part1(testExample)
+    assert solve_part2(testExample, engine='bitset') == solve_part2(testExample)
+
     for file in sys.argv[1:]:
         data = parse(file)
-        part1 = solve_part1(data)
-        part2 = solve_part2(data)
+        part1 = solve_part1(data, engine='bitset')
+        part2 = solve_part2(data, engine='bitset')
         print(f"""{file}:
         Part 1: The fewest number of minutes to reach the goal avoiding the blizzards is {part1}.
         Part 2: The shortest time to reach the goal, go back to the start, then reach the goal again is {part2}.
@@ -15,10 +15,20 @@ Here's a breakdown of how 4857 turns to SNAFU by building a stack.
     2/5 = 0, 2                  => stack = (2, -2, -1, -1, 1, 2) and stop because q = 0
 SNAFU of 4857 is `''.join(SNAFU_CHAR[r] for r in stack)`.
 
+The bulk codec below skips the per-digit arithmetic. Adding 2 to every SNAFU digit turns '=-012' into the
+ordinary base-5 digits '01234' and adds (5**k - 1) / 2 to the value of a k-digit number, so decode() is a
+str.translate() and int(..., 5), and encode() writes n + (5**k - 1) / 2 in base 5 six digits at a time from a table.
+Numbers longer than a few thousand digits are split in halves by powers of 5 (divide and conquer) instead,
+which also keeps int() under its limit on string conversions.
+
 The main block contains unit tests to test the code on toy examples.
 """
 import sys
 import pathlib
+import functools
+import itertools
+import random
+import time
 from typing import *
 
 Snafu = str
@@ -32,6 +42,14 @@ SNAFU_DIGITS: dict[Snafu, int] = {
 }
 SNAFU_CHARS: dict[int, Snafu] = {v: k for k, v in SNAFU_DIGITS.items()}
 
+_TO_BASE5 = str.maketrans('=-012', '01234')
+_NEGATE = str.maketrans('=-012', '210-=')
+_CHUNK_DIGITS = 6
+_CHUNK_TABLE: tuple[Snafu, ...] = tuple(
+    ''.join(chars) for chars in itertools.product('=-012', repeat=_CHUNK_DIGITS)
+)   # _CHUNK_TABLE[r] is r in base 5, zero-padded to six digits, with each digit shifted down by 2
+_SMALL_DIGITS = 1024    # longer numbers are converted by divide and conquer
+
 
 def parse(txt_filename: str) -> list[Sequence[Snafu]]:
     """Return file content as list of Snafu"""
@@ -66,10 +84,115 @@ def decimal_to_snafu(decimal: int) -> Sequence[Snafu]:
     return ''.join((decimal_to_snafu(q) if q else '', SNAFU_CHARS[r]))
 
 
-def solve_part1(puzzle_input: list[Sequence[Snafu]]) -> Sequence[Snafu]:
+@functools.cache
+def _power(k: int) -> int:
+    return 5 ** k
+
+
+@functools.cache
+def _offset(k: int) -> int:
+    """Return the value of '2' * k in base 5, i.e. what shifting every digit of a k-digit SNAFU number up by 2 adds."""
+    return (5 ** k - 1) // 2
+
+
+def _base5_value(digits: str) -> int:
+    """Return the value of a string of base-5 digits."""
+    if len(digits) <= _SMALL_DIGITS:
+        return int(digits, 5)
+    half = len(digits) // 2
+    return _base5_value(digits[:-half]) * _power(half) + _base5_value(digits[-half:])
+
+
+def _shifted_base5_digits(value: int, k: int) -> Snafu:
+    """
+    Return the k base-5 digits of 0 <= value < 5**k, each shifted down by 2 into a SNAFU digit.
+    """
+    if k > _SMALL_DIGITS:
+        half = k // 2
+        high, low = divmod(value, _power(half))
+        return _shifted_base5_digits(high, k - half) + _shifted_base5_digits(low, half)
+    chunks = []
+    for _ in range(0, k, _CHUNK_DIGITS):
+        value, r = divmod(value, _power(_CHUNK_DIGITS))
+        chunks.append(_CHUNK_TABLE[r])
+    return ''.join(reversed(chunks))[-k:]
+
+
+def decode(snafu: Snafu) -> int:
+    """Convert a SNAFU number to an integer."""
+    return _base5_value(snafu.translate(_TO_BASE5)) - _offset(len(snafu))
+
+
+def encode(decimal: int) -> Snafu:
+    """Convert an integer to a SNAFU number."""
+    if decimal < 0:
+        return encode(-decimal).translate(_NEGATE)
+    # the fewest digits k for which decimal <= (5**k - 1) / 2
+    k = max(1, (decimal.bit_length() * 431) // 1000)     # log(2) / log(5) = 0.4307
+    while k > 1 and _offset(k - 1) >= decimal:
+        k -= 1
+    while _offset(k) < decimal:
+        k += 1
+    return _shifted_base5_digits(decimal + _offset(k), k)
+
+
+def decode_many(snafus: Iterable[Snafu]) -> list[int]:
+    """Convert SNAFU numbers to integers."""
+    return [
+        int(snafu.translate(_TO_BASE5), 5) - _offset(len(snafu)) if len(snafu) <= _SMALL_DIGITS else decode(snafu)
+        for snafu in snafus
+    ]
+
+
+def encode_many(decimals: Iterable[int]) -> list[Snafu]:
+    """Convert integers to SNAFU numbers."""
+    return list(map(encode, decimals))
+
+
+def read_snafus(txt_filename: str) -> Iterator[Snafu]:
+    """Yield the SNAFU numbers of the file one line at a time."""
+    with open(txt_filename) as file:
+        for line in file:
+            yield line.rstrip('\n')
+
+
+def sum_snafus(snafus: Iterable[Snafu], batch_size: int = 10_000) -> int:
+    """Return the sum of the SNAFU numbers, decoding them in batches."""
+    snafus = iter(snafus)
+    total = 0
+    while batch := list(itertools.islice(snafus, batch_size)):
+        total += sum(decode_many(batch))
+    return total
+
+
+def solve_part1(puzzle_input: Iterable[Snafu]) -> Snafu:
+    return encode(sum_snafus(puzzle_input))
+
+
+def _solve_part1_recursive(puzzle_input: list[Sequence[Snafu]]) -> Sequence[Snafu]:
     return decimal_to_snafu(sum(map(snafu_to_decimal, puzzle_input)))
 
 
+def benchmark(counts: Iterable[int] = (100_000,), digits: Iterable[int] = (5, 20, 100)) -> None:
+    """
+    Print how many numbers per second the bulk codec and the per-digit functions decode and encode
+    on `counts` random SNAFU numbers of each length in `digits`.
+    """
+    rng = random.Random(25)
+    for n, k in itertools.product(counts, digits):
+        snafus = [rng.choice('12') + ''.join(rng.choices('=-012', k=k - 1)) for _ in range(n)]
+        decimals = decode_many(snafus)
+        for name, function, data in (
+            ('decode_many', decode_many, snafus),
+            ('snafu_to_decimal', lambda xs: list(map(snafu_to_decimal, xs)), snafus),
+            ('encode_many', encode_many, decimals),
+            ('decimal_to_snafu', lambda xs: list(map(decimal_to_snafu, xs)), decimals),
+        ):
+            start = time.perf_counter()
+            function(data)
+            print(f'{n:>8} x {k:>3} digits {name:>16}: {n / (time.perf_counter() - start):>12,.0f} numbers/s')
+
+
 if __name__ == '__main__':
     title = 'Day 25: Full of Hot Air'
     print(title.center(50, '-'))
@@ -106,9 +229,19 @@ if __name__ == '__main__':
     assert decimal_to_snafu(106) == '1-11'
     assert decimal_to_snafu(4857) == ''.join(SNAFU_CHARS[r] for r in (2, -2, -1, -1, 1, 2))
 
+    # test the bulk codec against the per-digit functions
+    numbers = list(range(-3000, 3001)) + [5 ** k + d for k in range(1, 40) for d in (-3, -2, -1, 0, 1, 2, 3)]
+    assert encode_many(numbers) == [decimal_to_snafu(n) for n in numbers]
+    assert decode_many(encode_many(numbers)) == numbers
+    assert all(snafu_to_decimal(decimal_to_snafu(n)) == n for n in numbers)
+    huge = 7 ** 20_000 - 3 ** 15_000
+    assert decode(encode(huge)) == huge and decode(encode(-huge)) == -huge
+    assert encode(huge).translate(_TO_BASE5)[0] in '34'
+
+    assert solve_part1(read_snafus('day25_test.txt')) == _solve_part1_recursive(parse('day25_test.txt'))
+
     for file in sys.argv[1:]:
-        data = parse(file)
-        part1 = solve_part1(data)
+        part1 = solve_part1(read_snafus(file))
         print(f"""{file}:
         Part 1: The SNAFU code to supply to Bob is {part1}.
         """)